@@ -1,10 +1,118 @@
-from django.contrib import admin
+import hashlib
+
+from django.contrib import admin, messages
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Count
+from django.utils.functional import cached_property
 from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+from .caching import cache_is_shared, get_model_version
 from .models import Student, Attendance, SystemLog, Department
 
+
+# Upper bound on staleness for changes the version counter cannot see
+# (queryset.update())
+CHANGELIST_CACHE_SECONDS = 60
+
+
+# Badges rendered once at import; changelist rows just pick one
+ENTRY_BADGES = {
+    'success': mark_safe('<span style="color: white; background-color: green; padding: 3px 10px; border-radius: 3px;">✓ Granted</span>'),
+    'denied': mark_safe('<span style="color: white; background-color: red; padding: 3px 10px; border-radius: 3px;">✗ Denied</span>'),
+}
+
+LOG_BADGE_COLORS = {
+    'info': '#17a2b8',
+    'success': '#28a745',
+    'warning': '#ffc107',
+    'error': '#dc3545'
+}
+LOG_BADGES = {
+    log_type: format_html(
+        '<span style="color: white; background-color: {}; padding: 3px 8px; border-radius: 3px;">{}</span>',
+        color,
+        log_type.upper()
+    )
+    for log_type, color in LOG_BADGE_COLORS.items()
+}
+
+_ACTIVE = mark_safe('<span style="color: green;">● Active</span>')
+_INACTIVE = mark_safe('<span style="color: red;">● Inactive</span>')
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for large append-only tables
+    
+    On PostgreSQL an unfiltered changelist reads the planner's row estimate
+    from pg_class instead of running COUNT(*) over the whole table.
+    Filtered querysets and other databases fall back to an exact count.
+    """
+    
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if connection.vendor == 'postgresql' and query is not None and not query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::BIGINT FROM pg_class WHERE relname = %s",
+                    [self.object_list.model._meta.db_table]
+                )
+                row = cursor.fetchone()
+            if row and row[0] > 0:
+                return row[0]
+        return super().count
+
+
+class CachedChangelistMixin:
+    """
+    Serve repeat changelist GETs from the cache
+    
+    The key covers the model's version counter (bumped by signals on every
+    save/delete), the query string, the user and their CSRF cookie, so a
+    cached page is never shown to another user or after the data changes.
+    
+    Only active with a shared cache (CACHE_URL): with per-process LocMem the
+    door system's inserts never bump this process's counter, and operators
+    would be shown pages without the newest entries.
+    """
+    
+    def changelist_view(self, request, extra_context=None):
+        if (request.method != 'GET' or not cache_is_shared()
+                or len(messages.get_messages(request))):
+            return super().changelist_view(request, extra_context)
+        
+        fingerprint = hashlib.md5(
+            '|'.join([
+                request.GET.urlencode(),
+                str(request.user.pk),
+                request.META.get('CSRF_COOKIE', ''),
+            ]).encode()
+        ).hexdigest()
+        key = f"cl:{self.model._meta.label_lower}:{get_model_version(self.model)}:{fingerprint}"
+        
+        response = cache.get(key)
+        if response is None:
+            response = super().changelist_view(request, extra_context)
+            if response.status_code == 200 and hasattr(response, 'render'):
+                response.render()
+                cache.set(key, response, CHANGELIST_CACHE_SECONDS)
+        return response
+
+
+class ActiveBadgeMixin:
+    """Shared is_active column for admins of models with an is_active flag"""
+    
+    def status_badge(self, obj):
+        return _ACTIVE if obj.is_active else _INACTIVE
+    status_badge.short_description = 'Status'
+
+
 @admin.register(Department)
-class DepartmentAdmin(admin.ModelAdmin):
-    list_display = ['name', 'status_badge', 'created_at']
+class DepartmentAdmin(ActiveBadgeMixin, admin.ModelAdmin):
+    list_display = ['name', 'student_count', 'status_badge', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name', 'description']
     list_per_page = 20
@@ -21,18 +129,23 @@ class DepartmentAdmin(admin.ModelAdmin):
     
     readonly_fields = ['created_at']
     
-    def status_badge(self, obj):
-        if obj.is_active:
-            return format_html('<span style="color: green;">● Active</span>')
-        return format_html('<span style="color: red;">● Inactive</span>')
-    status_badge.short_description = 'Status'
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_student_count=Count('students'))
+    
+    def student_count(self, obj):
+        return obj._student_count
+    student_count.short_description = 'Students'
+    student_count.admin_order_field = '_student_count'
 
 @admin.register(Student)
-class StudentAdmin(admin.ModelAdmin):
-    list_display = ['name', 'roll_number', 'department', 'user_type', 'status_badge', 'registered_at']
+class StudentAdmin(ActiveBadgeMixin, admin.ModelAdmin):
+    list_display = ['thumbnail_preview', 'name', 'roll_number', 'department', 'user_type', 'attendance_count', 'status_badge', 'registered_at']
     list_filter = ['user_type', 'department', 'is_active', 'registered_at']  #department__is_active
-    search_fields = ['name', 'roll_number', 'email', 'phone']
+    # Roll numbers are typed from the start, so match them as a prefix
+    # (LIKE 'q%') which the unique btree index can serve
+    search_fields = ['name', '^roll_number', 'email', 'phone']
     list_per_page = 20
+    list_select_related = ('department',)
     date_hierarchy = 'registered_at'
     
     fieldsets = (
@@ -56,32 +169,67 @@ class StudentAdmin(admin.ModelAdmin):
     
     readonly_fields = ['registered_at', 'photo_preview']
     
+    def get_queryset(self, request):
+        # face_encoding is a multi-KB JSON blob that the changelist never shows
+        queryset = super().get_queryset(request).select_related('department').defer('face_encoding')
+        # The entries column is changelist-only; the change/delete/history views
+        # and the Attendance autocomplete would pay the JOIN + GROUP BY for nothing
+        match = request.resolver_match
+        if match and match.url_name and match.url_name.endswith('_changelist'):
+            queryset = queryset.annotate(_attendance_count=Count('attendance_records'))
+        return queryset
+    
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        # The department dropdown only needs id + name for its <option>s
+        if db_field.name == 'department':
+            kwargs['queryset'] = Department.objects.only('id', 'name')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+    
     def photo_preview(self, obj):
         if obj.photo:
             return format_html('<img src="{}" style="max-width: 200px; max-height: 200px; border-radius: 5px;" />', obj.photo.url)
         return "No photo uploaded"
     photo_preview.short_description = 'Photo Preview'
     
-    def status_badge(self, obj):
-        if obj.is_active:
-            return format_html('<span style="color: green;">● Active</span>')
-        return format_html('<span style="color: red;">● Inactive</span>')
-    status_badge.short_description = 'Status'
+    def thumbnail_preview(self, obj):
+        if obj.thumbnail:
+            return format_html('<img src="{}" style="width: 48px; height: 48px; object-fit: cover; border-radius: 50%;" />', obj.thumbnail.url)
+        return ""
+    thumbnail_preview.short_description = 'Photo'
+    
+    def attendance_count(self, obj):
+        return getattr(obj, '_attendance_count', None)
+    attendance_count.short_description = 'Entries'
+    attendance_count.admin_order_field = '_attendance_count'
 
 
 @admin.register(Attendance)
-class AttendanceAdmin(admin.ModelAdmin):
-    list_display = ['student_name', 'date', 'time', 'entry_badge', 'location', 'confidence_display']
+class AttendanceAdmin(CachedChangelistMixin, admin.ModelAdmin):
+    # Name/roll number are the copies stored on each row, so the list needs no JOIN
+    list_display = ['student_name', 'student_roll_number', 'date', 'time', 'entry_badge', 'location', 'confidence_display']
     list_filter = ['entry_type', 'location', 'timestamp']
-    search_fields = ['student__name', 'student__roll_number']
+    search_fields = ['student_name', 'student_roll_number']
     date_hierarchy = 'timestamp'
     list_per_page = 50
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
+    # AJAX lookup (LIMIT 20) instead of a <select> holding every student
+    autocomplete_fields = ('student',)
     readonly_fields = ['timestamp']
     
-    def student_name(self, obj):
-        return obj.student.name if obj.student else 'Unknown'
-    student_name.short_description = 'Student/Staff'
+    # Columns the changelist renders; image_path and the rest stay in the DB
+    changelist_only = (
+        'timestamp', 'entry_type', 'location', 'confidence',
+        'student_name', 'student_roll_number',
+    )
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        match = request.resolver_match
+        if match and match.url_name and match.url_name.endswith('_changelist'):
+            queryset = queryset.only(*self.changelist_only)
+        return queryset
     
     def date(self, obj):
         return obj.timestamp.strftime('%Y-%m-%d')
@@ -93,8 +241,8 @@ class AttendanceAdmin(admin.ModelAdmin):
     
     def entry_badge(self, obj):
         if obj.entry_type == 'success':
-            return format_html('<span style="color: white; background-color: green; padding: 3px 10px; border-radius: 3px;">✓ Granted</span>')
-        return format_html('<span style="color: white; background-color: red; padding: 3px 10px; border-radius: 3px;">✗ Denied</span>')
+            return ENTRY_BADGES['success']
+        return ENTRY_BADGES['denied']
     entry_badge.short_description = 'Access'
     
     def confidence_display(self, obj):
@@ -106,26 +254,23 @@ class AttendanceAdmin(admin.ModelAdmin):
 
 
 @admin.register(SystemLog)
-class SystemLogAdmin(admin.ModelAdmin):
+class SystemLogAdmin(CachedChangelistMixin, admin.ModelAdmin):
     list_display = ['timestamp', 'log_badge', 'message_preview']
     list_filter = ['log_type', 'timestamp']
     search_fields = ['message', 'details']
     date_hierarchy = 'timestamp'
     list_per_page = 100
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
     readonly_fields = ['timestamp']
     
     def log_badge(self, obj):
-        colors = {
-            'info': '#17a2b8',
-            'success': '#28a745',
-            'warning': '#ffc107',
-            'error': '#dc3545'
-        }
-        color = colors.get(obj.log_type, '#6c757d')
+        badge = LOG_BADGES.get(obj.log_type)
+        if badge is not None:
+            return badge
         return format_html(
-            '<span style="color: white; background-color: {}; padding: 3px 8px; border-radius: 3px;">{}</span>',
-            color,
+            '<span style="color: white; background-color: #6c757d; padding: 3px 8px; border-radius: 3px;">{}</span>',
             obj.log_type.upper()
         )
     log_badge.short_description = 'Type'
@@ -0,0 +1,60 @@
+"""
+Cache helpers for the attendance app.
+
+Per-model version counters: cached pages and fragments include the
+current version in their key, and the version is bumped whenever a row
+of that model changes, so stale entries are simply never read again.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+# Backends whose contents (and version counters) live inside one process
+_PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_is_shared():
+    """
+    True when every process (web workers, door system) sees one cache
+
+    Only then do version bumps from the door system's writes reach the
+    web process.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    return backend not in _PROCESS_LOCAL_BACKENDS
+
+
+def model_version_key(model):
+    """Cache key holding the change counter for a model"""
+    return f"ver:{model._meta.label_lower}"
+
+
+def get_model_version(model):
+    """Current change counter for a model (0 until the first change)"""
+    return cache.get(model_version_key(model), 0)
+
+
+def bump_model_version(model):
+    """Invalidate everything keyed on the model's current version"""
+    key = model_version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # incr() refuses missing keys; start the counter instead
+        cache.set(key, 1, None)
+
+
+def versioned_get_or_set(model, name, default, timeout=300):
+    """
+    Cache a value derived from a model until the model changes
+
+    The key embeds the model's version, so any save/delete invalidates it;
+    timeout bounds staleness for writes the signals cannot see
+    (queryset.update(), other processes with a separate cache).
+    """
+    key = f"{name}:{model._meta.label_lower}:{get_model_version(model)}"
+    return cache.get_or_set(key, default, timeout)
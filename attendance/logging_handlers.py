@@ -0,0 +1,31 @@
+"""
+Logging handlers for the attendance app.
+
+Referenced from settings.LOGGING, so this module must not import Django
+models or the face recognition services.
+"""
+
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class QueuedConsoleHandler(QueueHandler):
+    """
+    Console handler whose writes happen on a listener thread
+
+    Callers only enqueue the (already formatted) record, so notification
+    senders never block on a slow console.
+    """
+
+    def __init__(self):
+        super().__init__(queue.SimpleQueue())
+        self.listener = QueueListener(self.queue, logging.StreamHandler())
+        self.listener.start()
+
+    def close(self):
+        # Called by logging.shutdown() at exit: drain the queue first
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+        super().close()
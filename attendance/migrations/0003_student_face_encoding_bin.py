@@ -0,0 +1,32 @@
+# Generated by Django 5.2.13 on 2026-10-15
+
+import json
+
+import numpy as np
+from django.db import migrations, models
+
+
+def backfill_face_encoding_bin(apps, schema_editor):
+    Student = apps.get_model('attendance', 'Student')
+    for student in Student.objects.only('id', 'face_encoding').iterator():
+        try:
+            encodings = np.asarray(json.loads(student.face_encoding), dtype=np.float32).reshape(-1, 128)
+        except (TypeError, ValueError):
+            continue
+        Student.objects.filter(pk=student.pk).update(face_encoding_bin=encodings.tobytes())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_notificationstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='face_encoding_bin',
+            field=models.BinaryField(blank=True, editable=False, null=True, verbose_name='Face Encoding (float32)'),
+        ),
+        migrations.RunPython(backfill_face_encoding_bin, migrations.RunPython.noop),
+    ]
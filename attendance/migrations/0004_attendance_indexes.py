@@ -0,0 +1,41 @@
+# Generated by Django 5.2.13 on 2026-10-15
+
+from django.db import migrations, models
+
+
+def create_timestamp_brin(apps, schema_editor):
+    # BRIN suits the append-only timestamp column; PostgreSQL only
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS att_ts_brin ON attendance_attendance USING BRIN (timestamp)'
+    )
+
+
+def drop_timestamp_brin(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS att_ts_brin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_student_face_encoding_bin'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['-timestamp'], name='att_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['student', '-timestamp'], name='att_student_ts'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['entry_type', '-timestamp'], name='att_type_ts'),
+        ),
+        migrations.RunPython(create_timestamp_brin, drop_timestamp_brin),
+    ]
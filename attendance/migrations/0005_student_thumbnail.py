@@ -0,0 +1,18 @@
+# Generated by Django 5.2.13 on 2026-10-15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0004_attendance_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='faces/thumbs/', verbose_name='Photo Thumbnail'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.13 on 2026-10-15
+
+from django.db import migrations
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # GIN trigram indexes serve ILIKE '%q%' admin/autocomplete search; PostgreSQL only
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS student_name_trgm ON attendance_student USING GIN (name gin_trgm_ops)'
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS student_roll_trgm ON attendance_student USING GIN (roll_number gin_trgm_ops)'
+    )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS student_name_trgm')
+    schema_editor.execute('DROP INDEX IF EXISTS student_roll_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_student_thumbnail'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
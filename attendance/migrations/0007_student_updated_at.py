@@ -0,0 +1,20 @@
+# Generated by Django 5.2.13 on 2026-10-15
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0006_student_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Last Updated'),
+            preserve_default=False,
+        ),
+    ]
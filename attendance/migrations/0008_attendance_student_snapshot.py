@@ -0,0 +1,35 @@
+# Generated by Django 5.2.13 on 2026-10-15
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_student_fields(apps, schema_editor):
+    Attendance = apps.get_model('attendance', 'Attendance')
+    Student = apps.get_model('attendance', 'Student')
+    student = Student.objects.filter(pk=OuterRef('student_id'))
+    Attendance.objects.filter(student__isnull=False).update(
+        student_name=Subquery(student.values('name')[:1]),
+        student_roll_number=Subquery(student.values('roll_number')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0007_student_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='student_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='Student Name'),
+        ),
+        migrations.AddField(
+            model_name='attendance',
+            name='student_roll_number',
+            field=models.CharField(blank=True, default='', editable=False, max_length=50, verbose_name='Roll Number'),
+        ),
+        migrations.RunPython(copy_student_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.13 on 2026-10-15
+
+from django.db import migrations
+
+
+def create_email_trigram_index(apps, schema_editor):
+    # Completes the 0006 indexes so all three student_list search columns are served; PostgreSQL only
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS student_email_trgm ON attendance_student USING GIN (email gin_trgm_ops)'
+    )
+
+
+def drop_email_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS student_email_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0008_attendance_student_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_email_trigram_index, drop_email_trigram_index),
+    ]
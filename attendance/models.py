@@ -1,7 +1,37 @@
 from django.db import models
 from django.utils import timezone
 from django.contrib.auth.models import User  
+from django.core.files.base import ContentFile
+from io import BytesIO
 import json
+import logging
+import os
+import numpy as np
+
+# orjson parses numeric JSON arrays several times faster than the stdlib
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Length of a dlib/face_recognition face descriptor
+FACE_ENCODING_DIM = 128
+
+# Bounding box of the pre-resized profile thumbnail
+THUMBNAIL_SIZE = (160, 160)
+
+
+def pack_face_encodings(encodings):
+    """Pack a list of face encodings into raw float32 bytes (K x 128)"""
+    return np.asarray(encodings, dtype=np.float32).reshape(-1, FACE_ENCODING_DIM).tobytes()
+
+
+def unpack_face_encodings(data):
+    """Unpack raw float32 bytes into a (K, 128) array without copying"""
+    return np.frombuffer(data, dtype=np.float32).reshape(-1, FACE_ENCODING_DIM)
 
 
 class Department(models.Model):
@@ -55,11 +85,14 @@ class Student(models.Model):
     
     # Face recognition data
     face_encoding = models.TextField(verbose_name="Face Encoding (JSON)")
+    face_encoding_bin = models.BinaryField(null=True, blank=True, editable=False, verbose_name="Face Encoding (float32)")
     photo = models.ImageField(upload_to='faces/', blank=True, null=True, verbose_name="Profile Photo")
+    thumbnail = models.ImageField(upload_to='faces/thumbs/', blank=True, null=True, editable=False, verbose_name="Photo Thumbnail")
     
     # Status
     is_active = models.BooleanField(default=True, verbose_name="Active Status")
     registered_at = models.DateTimeField(default=timezone.now, verbose_name="Registration Date")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Last Updated")
     
     class Meta:
         ordering = ['name']
@@ -69,12 +102,94 @@ class Student(models.Model):
     def __str__(self):
         return f"{self.name} ({self.roll_number})"
     
-    def get_face_encodings(self):
-        """Get face encodings as Python list"""
+    def save(self, *args, **kwargs):
+        # Keep the binary copy of the encodings in sync with the JSON field
+        update_fields = kwargs.get('update_fields')
+        if 'face_encoding' not in self.get_deferred_fields() and (
+            update_fields is None or 'face_encoding' in update_fields
+        ):
+            try:
+                self.face_encoding_bin = pack_face_encodings(_json_loads(self.face_encoding))
+            except (TypeError, ValueError):
+                self.face_encoding_bin = None
+            self._face_encodings_cache = None
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'face_encoding_bin'}
+        
+        photo_saved = 'photo' not in self.get_deferred_fields() and (
+            update_fields is None or 'photo' in update_fields
+        )
+        
+        # auto_now is skipped by partial saves unless listed; the face
+        # gallery disk cache keys off this timestamp
+        if update_fields is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'updated_at'}
+        super().save(*args, **kwargs)
+        
+        # Storage assigns the final photo name during save(), so the
+        # thumbnail is derived afterwards and stored with a plain UPDATE
+        # (no second round of save signals)
+        if photo_saved and self._refresh_thumbnail():
+            type(self)._default_manager.using(self._state.db).filter(pk=self.pk).update(
+                thumbnail=self.thumbnail.name or None
+            )
+    
+    def _refresh_thumbnail(self):
+        """
+        Resize the stored profile photo once so list pages never load the original
+        
+        Returns True when the thumbnail field changed.
+        """
+        if not self.photo:
+            if not self.thumbnail:
+                return False
+            self.thumbnail.delete(save=False)
+            self.thumbnail = None
+            return True
+        
+        stem = os.path.splitext(os.path.basename(self.photo.name))[0]
+        thumb_name = f"faces/thumbs/{stem}.jpg"
+        if self.thumbnail and self.thumbnail.name == thumb_name:
+            return False
+        
         try:
-            return json.loads(self.face_encoding)
-        except:
-            return []
+            from PIL import Image
+            
+            with self.photo.open('rb') as photo, Image.open(photo) as image:
+                image = image.convert('RGB')
+                image.thumbnail(THUMBNAIL_SIZE)
+                buffer = BytesIO()
+                image.save(buffer, 'JPEG', quality=85, optimize=True)
+            
+            if self.thumbnail:
+                self.thumbnail.delete(save=False)
+            storage = self._meta.get_field('thumbnail').storage
+            if storage.exists(thumb_name):
+                storage.delete(thumb_name)
+            self.thumbnail.save(thumb_name.rsplit('/', 1)[-1], ContentFile(buffer.getvalue()), save=False)
+            return True
+        except Exception:
+            logger.exception("Thumbnail generation failed for %s", self.name)
+            return False
+    
+    def get_face_encodings(self):
+        """Get face encodings as a (K, 128) float32 array (memoized per instance)"""
+        encodings = getattr(self, '_face_encodings_cache', None)
+        if encodings is not None:
+            return encodings
+        
+        if self.face_encoding_bin:
+            encodings = unpack_face_encodings(self.face_encoding_bin)
+        else:
+            try:
+                encodings = np.asarray(
+                    _json_loads(self.face_encoding), dtype=np.float32
+                ).reshape(-1, FACE_ENCODING_DIM)
+            except (TypeError, ValueError):
+                encodings = np.empty((0, FACE_ENCODING_DIM), dtype=np.float32)
+        
+        self._face_encodings_cache = encodings
+        return encodings
 
 
 class Attendance(models.Model):
@@ -99,15 +214,39 @@ class Attendance(models.Model):
     image_path = models.CharField(max_length=255, blank=True, null=True, verbose_name="Captured Image Path")
     confidence = models.FloatField(null=True, blank=True, verbose_name="Recognition Confidence")
     
+    # Copied from the student so reports and lists never join it; kept in
+    # sync by the post_save signal on Student
+    student_name = models.CharField(max_length=100, blank=True, default='', editable=False, verbose_name="Student Name")
+    student_roll_number = models.CharField(max_length=50, blank=True, default='', editable=False, verbose_name="Roll Number")
+    
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['-timestamp'], name='att_ts_idx'),
+            models.Index(fields=['student', '-timestamp'], name='att_student_ts'),
+            models.Index(fields=['entry_type', '-timestamp'], name='att_type_ts'),
+        ]
         verbose_name = 'Attendance Record'
         verbose_name_plural = 'Attendance Records'
     
     def __str__(self):
-        if self.student:
-            return f"{self.student.name} - {self.timestamp.strftime('%Y-%m-%d %H:%M')}"
+        if self.student_id:
+            return f"{self.student_name or self.student.name} - {self.timestamp.strftime('%Y-%m-%d %H:%M')}"
         return f"Unknown - {self.timestamp.strftime('%Y-%m-%d %H:%M')}"
+    
+    def save(self, *args, **kwargs):
+        # Re-copy on every save so a record moved to another student never
+        # keeps the previous student's name
+        if self.student_id:
+            self.student_name = self.student.name
+            self.student_roll_number = self.student.roll_number
+        else:
+            self.student_name = ''
+            self.student_roll_number = ''
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'student_name', 'student_roll_number'}
+        super().save(*args, **kwargs)
 
 
 class SystemLog(models.Model):
@@ -17,6 +17,9 @@ Usage:
 from .face_recognition_service import (
     FaceRecognitionService,
     get_face_recognition_service,
+    refresh_face_service_if_loaded,
+    add_face_to_service_if_loaded,
+    refresh_face_service_in_background,
     reset_face_service,
     USB_CAMERA_INDEX,
     BROKEN_CAMERA_INDEX,
@@ -29,6 +32,9 @@ __all__ = [
     
     # Singleton functions
     'get_face_recognition_service',
+    'refresh_face_service_if_loaded',
+    'add_face_to_service_if_loaded',
+    'refresh_face_service_in_background',
     'reset_face_service',
     
     # Camera constants
@@ -0,0 +1,225 @@
+"""
+Face Index
+==========
+Nearest-neighbour search over the registered face gallery.
+
+Uses FAISS when it is installed (exact flat index for small galleries,
+HNSW graph over int8 scalar-quantized vectors for large ones), otherwise
+a Numba-compiled scan (over int8 codes with an exact re-rank for large
+galleries), and finally a vectorized NumPy scan.
+
+Usage:
+    index = FaceIndex(service.known_encodings_matrix)
+    distances, indices = index.search(unknown_encoding, k=2)
+"""
+
+import copy
+from typing import Tuple
+
+import numpy as np
+
+from . import kernels
+
+# Optional FAISS backend
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+
+# Galleries at least this large use an approximate HNSW graph whose
+# vectors are stored as 8-bit scalar codes (4x less memory than float32)
+HNSW_MIN_SIZE = 5000
+HNSW_NEIGHBORS = 32
+HNSW_EF_CONSTRUCTION = 64
+HNSW_EF_SEARCH = 64
+
+# Approximate backends (FAISS HNSW-SQ, the int8 scan) fetch this many
+# candidates and re-rank them with the exact float32 distance, so the
+# distances compared against the door tolerance are never quantized
+RERANK_CANDIDATES = 32
+
+
+def quantize_int8(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row int8 quantization
+
+    Returns (codes, scales) with row ~= codes * scale; codes are (N, 128)
+    int8, a quarter of the float32 bytes.
+    """
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(matrix / scales[:, None]).astype(np.int8)
+    return np.ascontiguousarray(codes), scales.astype(np.float32)
+
+
+class FaceIndex:
+    """
+    L2 nearest-neighbour index over an (N, 128) float32 encoding matrix
+
+    Distances returned by search() are plain Euclidean distances, the same
+    scale as face_recognition.face_distance(), so tolerances carry over.
+    """
+
+    def __init__(self, matrix: np.ndarray, hnsw_min_size: int = HNSW_MIN_SIZE):
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.size = self.matrix.shape[0]
+        self.dim = self.matrix.shape[1] if self.matrix.ndim == 2 else 128
+        self._faiss_index = None
+        # ||a - b||^2 = ||a||^2 + ||b||^2 - 2 a.b, so a query is one GEMV
+        self.sq_norms = np.einsum('ij,ij->i', self.matrix, self.matrix) if self.size else np.empty(0, dtype=np.float32)
+        # Nearest row = argmax of (a.b - ||a||^2 / 2); ||b||^2 only matters for the winners
+        self.half_sq_norms = 0.5 * self.sq_norms
+        self.codes = self.scales = None
+        # True when the FAISS index returns quantized, approximate distances
+        self._approximate = False
+
+        if FAISS_AVAILABLE and self.size:
+            if self.size >= hnsw_min_size:
+                index = faiss.IndexHNSWSQ(
+                    self.dim, faiss.ScalarQuantizer.QT_8bit, HNSW_NEIGHBORS, faiss.METRIC_L2
+                )
+                index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+                index.hnsw.efSearch = HNSW_EF_SEARCH
+                # Learns the per-dimension ranges used for the int8 codes
+                index.train(self.matrix)
+                self._approximate = True
+            else:
+                index = faiss.IndexFlatL2(self.dim)
+            index.add(self.matrix)
+            self._faiss_index = index
+        elif kernels.NUMBA_AVAILABLE and self.size >= hnsw_min_size:
+            self.codes, self.scales = quantize_int8(self.matrix)
+
+    def extended(self, rows: np.ndarray) -> 'FaceIndex':
+        """
+        New index with rows appended; this one is left untouched
+        
+        Searches may keep running on the old index while the new one is
+        built. FAISS indexes (flat and the already-trained HNSW) are cloned
+        and the rows added to the clone, so the graph is not rebuilt; the
+        scan backends get new arrays. Removals still need a full rebuild:
+        HNSW graphs do not support remove_ids().
+        """
+        rows = np.ascontiguousarray(np.atleast_2d(rows), dtype=np.float32)
+        new = copy.copy(self)
+        if not len(rows):
+            return new
+        
+        if self._faiss_index is not None:
+            new._faiss_index = faiss.clone_index(self._faiss_index)
+            new._faiss_index.add(rows)
+        
+        new.matrix = np.vstack([self.matrix, rows]) if self.size else rows
+        new.size = new.matrix.shape[0]
+        new.sq_norms = np.concatenate([self.sq_norms, np.einsum('ij,ij->i', rows, rows)])
+        new.half_sq_norms = 0.5 * new.sq_norms
+        if self.codes is not None:
+            codes, scales = quantize_int8(rows)
+            new.codes = np.vstack([self.codes, codes])
+            new.scales = np.concatenate([self.scales, scales])
+        return new
+    
+    @property
+    def backend(self) -> str:
+        """Name of the backend answering queries"""
+        if self._faiss_index is None:
+            if self.codes is not None:
+                return 'numba-int8'
+            return 'numba' if kernels.NUMBA_AVAILABLE else 'numpy'
+        return type(self._faiss_index).__name__
+
+    def distances(self, query: np.ndarray) -> np.ndarray:
+        """Euclidean distance from query to every row, via one BLAS matrix-vector product"""
+        if not self.size:
+            return np.empty(0, dtype=np.float32)
+        return np.sqrt(self._sq_distances(np.asarray(query, dtype=np.float32).ravel()))
+
+    def _sq_distances(self, query: np.ndarray) -> np.ndarray:
+        sq_distances = self.sq_norms + np.dot(query, query) - 2 * (self.matrix @ query)
+        # Rounding can push near-identical vectors slightly below zero
+        return np.maximum(sq_distances, 0, out=sq_distances)
+
+    def search(self, query: np.ndarray, k: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k nearest registered encodings
+
+        Args:
+            query: Face encoding (128,)
+            k: Number of neighbours to return
+
+        Returns:
+            Tuple of (distances, indices), both sorted nearest first and
+            truncated to the gallery size
+        """
+        k = min(k, self.size)
+        if k <= 0:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+        query = np.ascontiguousarray(query, dtype=np.float32).reshape(1, -1)
+
+        if self._faiss_index is not None:
+            if self._approximate:
+                n = min(max(RERANK_CANDIDATES, k), self.size)
+                _, indices = self._faiss_index.search(query, n)
+                candidates = indices[0][indices[0] >= 0]
+                return self._rerank(query[0], candidates, k)
+            sq_distances, indices = self._faiss_index.search(query, k)
+            return np.sqrt(np.maximum(sq_distances[0], 0)), indices[0]
+
+        if self.codes is not None:
+            return self._search_int8(query[0], k)
+
+        if kernels.NUMBA_AVAILABLE and k <= 2:
+            # The recognition hot path: best match + runner-up in one fused pass
+            best_i, best_d, second_i, second_d = kernels.nearest_two_l2(self.matrix, query[0])
+            if k == 1:
+                return np.sqrt(np.array([best_d], dtype=np.float32)), np.array([best_i], dtype=np.int64)
+            return (
+                np.sqrt(np.array([best_d, second_d], dtype=np.float32)),
+                np.array([best_i, second_i], dtype=np.int64),
+            )
+
+        if kernels.NUMBA_AVAILABLE:
+            distances = kernels.l2_distances(self.matrix, query[0], np.empty(self.size, dtype=np.float32))
+            if k < self.size:
+                nearest = np.argpartition(distances, k - 1)[:k]
+            else:
+                nearest = np.arange(self.size)
+            nearest = nearest[np.argsort(distances[nearest])]
+            return distances[nearest], nearest
+
+        # One SGEMV scores every row; exact L2 is recovered only for the winners
+        q = query[0]
+        scores = self.matrix @ q
+        scores -= self.half_sq_norms
+        if k == 1:
+            nearest = np.array([scores.argmax()])
+        elif k < self.size:
+            nearest = np.argpartition(scores, self.size - k)[self.size - k:]
+            nearest = nearest[np.argsort(-scores[nearest])]
+        else:
+            nearest = np.argsort(-scores)
+        sq_distances = np.maximum(np.dot(q, q) - 2 * scores[nearest], 0)
+        return np.sqrt(sq_distances), nearest
+
+    def _search_int8(self, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Coarse int8 scan, then exact L2 over the best few candidates"""
+        probe_codes, probe_scale = quantize_int8(query)
+        scores = kernels.int8_scores(
+            self.codes, self.scales, self.half_sq_norms,
+            probe_codes[0], probe_scale[0], np.empty(self.size, dtype=np.float32),
+        )
+        n = min(max(RERANK_CANDIDATES, k), self.size)
+        candidates = np.argpartition(scores, self.size - n)[self.size - n:]
+        return self._rerank(query, candidates, k)
+    
+    def _rerank(self, query: np.ndarray, candidates: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact float32 L2 over the candidate rows, nearest k first"""
+        candidates = np.asarray(candidates, dtype=np.int64)
+        diff = self.matrix[candidates] - query
+        sq_distances = np.einsum('ij,ij->i', diff, diff)
+        order = np.argsort(sq_distances)[:k]
+        return np.sqrt(sq_distances[order]), candidates[order]
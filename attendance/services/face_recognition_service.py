@@ -15,11 +15,37 @@ import face_recognition
 import cv2
 import numpy as np
 import json
+import logging
 import os
+import tempfile
+import threading
 import time
-from datetime import datetime
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, List, Tuple, Dict, Any
 
+from . import kernels
+from .face_index import FaceIndex, HNSW_MIN_SIZE
+
+# dlib build flags decide whether the CNN detector can run on a GPU
+try:
+    import dlib
+    DLIB_AVAILABLE = True
+    DLIB_USE_CUDA = bool(getattr(dlib, 'DLIB_USE_CUDA', False))
+except ImportError:
+    DLIB_AVAILABLE = False
+    DLIB_USE_CUDA = False
+
+# orjson serializes float32 arrays natively (no per-float Python objects)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Per-save messages go through logging so burst captures don't block on stdout
+logger = logging.getLogger(__name__)
+
 # ═══════════════════════════════════════════════════════════════════
 # CAMERA CONFIGURATION - IMPORTANT!
 # ═══════════════════════════════════════════════════════════════════
@@ -31,6 +57,13 @@ DEFAULT_CAMERA_INDEX = 0
 
 # ═══════════════════════════════════════════════════════════════════
 
+# Registration batches at least this large run face detection on the shared thread pool
+PARALLEL_ENCODE_MIN_IMAGES = 4
+
+# Name label bar drawn under a face box (height in pixels, default color)
+LABEL_HEIGHT = 25
+LABEL_COLOR = (0, 255, 0)
+
 # Try to import Django settings
 try:
     from django.conf import settings
@@ -38,6 +71,12 @@ try:
 except:
     DJANGO_SETTINGS_AVAILABLE = False
 
+# Resolved once; save_captured_image() only joins onto it
+try:
+    _MEDIA_ROOT = str(settings.MEDIA_ROOT) if DJANGO_SETTINGS_AVAILABLE else 'media'
+except Exception:
+    _MEDIA_ROOT = 'media'
+
 # Models will be imported lazily to avoid circular import issues
 DJANGO_AVAILABLE = None  # Will be set on first check
 
@@ -82,6 +121,99 @@ def get_camera_index() -> int:
     return USB_CAMERA_INDEX
 
 
+class _CameraReader:
+    """
+    Grabs frames on a background thread and keeps only the newest one
+    
+    Slow detection never lets OpenCV's internal queue fill with stale
+    frames: read() always returns the freshest frame it has not returned
+    before, blocking briefly until one arrives.
+    """
+    
+    def __init__(self, cap: cv2.VideoCapture):
+        self.cap = cap
+        self._cond = threading.Condition()
+        self._latest: Optional[np.ndarray] = None
+        self._frame_id = 0
+        self._returned_id = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='camera-reader', daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            with self._cond:
+                if not ret:
+                    self._running = False
+                else:
+                    self._latest = frame
+                    self._frame_id += 1
+                self._cond.notify_all()
+    
+    def read(self, timeout: float = 1.0) -> Tuple[bool, Optional[np.ndarray]]:
+        """Same contract as cv2.VideoCapture.read(), but never returns a stale frame"""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self._frame_id != self._returned_id or not self._running,
+                timeout
+            )
+            if self._frame_id == self._returned_id:
+                return False, None
+            self._returned_id = self._frame_id
+            return True, self._latest
+    
+    def release(self):
+        self._running = False
+        self._thread.join(timeout=1.0)
+        self.cap.release()
+
+
+def _open_camera(camera_index: int) -> cv2.VideoCapture:
+    """Open a camera at 640x480 / 30 fps MJPG with a one-frame driver buffer"""
+    cap = cv2.VideoCapture(camera_index)
+    if cap.isOpened():
+        # MJPG before the resolution: uncompressed YUYV at 640x480 saturates
+        # USB 2.0 around 15 fps on most webcams
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        cap.set(cv2.CAP_PROP_FPS, 30)
+        # Latest frame only; stops V4L2/DirectShow queueing stale frames
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+class FaceGallery:
+    """
+    One immutable snapshot of the registered faces
+    
+    Row i of the matrix / index belongs to ids[i], names[i] and students[i].
+    The service publishes a new snapshot with a single attribute assignment,
+    so a reader that takes service.gallery once always gets an index and
+    lists that agree, even while a reload runs on another thread.
+    """
+    
+    __slots__ = ('matrix', 'encodings', 'ids', 'ids_array', 'names', 'students', 'index')
+    
+    def __init__(self, matrix: np.ndarray, ids: List[int], students: List[Any],
+                 index: Optional[FaceIndex] = None, hnsw_min_size: int = HNSW_MIN_SIZE):
+        self.matrix = matrix
+        # Row views of the matrix, not copies
+        self.encodings = list(matrix)
+        self.ids = list(ids)
+        self.ids_array = np.asarray(self.ids, dtype=np.int64)
+        self.students = list(students)
+        self.names = [student.name for student in self.students]
+        self.index = index if index is not None else FaceIndex(matrix, hnsw_min_size)
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+EMPTY_GALLERY_MATRIX = np.empty((0, 128), dtype=np.float32)
+
+
 class FaceRecognitionService:
     """
     Main Face Recognition Service Class
@@ -100,7 +232,11 @@ class FaceRecognitionService:
         result = service.recognize_face(image)
     """
     
-    def __init__(self, tolerance: float = 0.6, model: str = 'hog', camera_index: int = None):
+    # dlib models are process-wide; warm them up once per process
+    _warmed = False
+    
+    def __init__(self, tolerance: float = 0.6, model: str = 'hog', camera_index: int = None,
+                 verbose: bool = True):
         """
         Initialize Face Recognition Service
         """
@@ -108,6 +244,14 @@ class FaceRecognitionService:
         self.model = model
         self.min_match_confidence = 0.58
         self.min_match_gap = 0.04
+        
+        # Live preview: detect on a downscaled frame, every Nth frame
+        self.detection_scale = 0.5
+        self.detection_upsample = 1
+        self.detection_interval = 2
+        
+        # Gallery size at which FaceIndex switches to approximate search
+        self.index_hnsw_min_size = HNSW_MIN_SIZE
 
         if DJANGO_SETTINGS_AVAILABLE:
             try:
@@ -117,6 +261,15 @@ class FaceRecognitionService:
                 self.min_match_gap = float(
                     getattr(settings, 'FACE_RECOGNITION_MIN_GAP', self.min_match_gap)
                 )
+                self.detection_scale = float(
+                    getattr(settings, 'LIVE_DETECTION_SCALE', self.detection_scale)
+                )
+                self.detection_upsample = int(
+                    getattr(settings, 'LIVE_DETECTION_UPSAMPLE', self.detection_upsample)
+                )
+                self.index_hnsw_min_size = int(
+                    getattr(settings, 'FACE_INDEX_HNSW_MIN_SIZE', self.index_hnsw_min_size)
+                )
             except Exception:
                 pass
         
@@ -127,11 +280,12 @@ class FaceRecognitionService:
             self.camera_index = camera_index
         
         
-        # Cache for registered faces (Level 1 Optimization)
-        self.known_face_encodings: List[np.ndarray] = []
-        self.known_face_names: List[str] = []
-        self.known_face_ids: List[int] = []
-        self.known_students: List[Any] = []
+        # Cache for registered faces (Level 1 Optimization): contiguous
+        # (N, 128) float32 gallery + parallel id/name/student lists, swapped
+        # as one snapshot; writers (reload, incremental add) serialise here
+        self.gallery: FaceGallery = FaceGallery(EMPTY_GALLERY_MATRIX, [], [])
+        self._gallery_write_lock = threading.RLock()
+        self._num_registered: int = 0
         
         # Performance tracking
         self.last_recognition_time: float = 0
@@ -142,11 +296,35 @@ class FaceRecognitionService:
         self.min_face_size = 100  # Minimum face size in pixels
         self.max_image_size = (640, 480)  # Resize large images for speed
         
+        # OpenCL (T-API) for preview resize/drawing when a GPU driver is present
+        self.use_opencl = cv2.ocl.haveOpenCL()
+        if self.use_opencl:
+            cv2.ocl.setUseOpenCL(True)
+        
+        # Pre-rendered static header/footer bars, keyed by frame shape + text
+        self._chrome_cache: Dict[tuple, Tuple[np.ndarray, np.ndarray]] = {}
+        
+        # Scratch frame reused by draw_face_box (resized when the frame shape changes)
+        self._annot_buf: Optional[np.ndarray] = None
+        
+        # Pre-rendered name labels for draw_face_box, keyed by (name, color)
+        self._name_sprites: Dict[Tuple[str, tuple], np.ndarray] = {}
+        
+        # Resolved (and already created) save folders, keyed by subfolder name
+        self._save_dirs: Dict[str, str] = {}
+        
+        self._warm_up()
+        
+        if not verbose:
+            return
+        
         print("=" * 50)
         print("🧠 Face Recognition Service initialized")
         print("=" * 50)
         print(f"   Tolerance: {self.tolerance}")
         print(f"   Model: {self.model}")
+        print(f"   dlib CUDA: {'ON' if DLIB_USE_CUDA else 'OFF'}")
+        print(f"   OpenCL: {'ON' if self.use_opencl else 'OFF'}")
         print(f"   📷 Camera Index: {self.camera_index}")
         print(f"   Min Confidence: {self.min_match_confidence:.2f}")
         print(f"   Min Distance Gap: {self.min_match_gap:.2f}")
@@ -171,14 +349,8 @@ class FaceRecognitionService:
             for (top, right, bottom, left) in faces:
                 cv2.rectangle(image, (left, top), (right, bottom), (0, 255, 0), 2)
         """
-        # Convert BGR to RGB if needed (OpenCV uses BGR, face_recognition uses RGB)
-        if len(image.shape) == 3 and image.shape[2] == 3:
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        else:
-            rgb_image = image
-        
-        # Resize image if too large (for speed)
-        rgb_image = self._resize_image(rgb_image)
+        # Shrink if too large, then BGR -> RGB (OpenCV uses BGR, face_recognition uses RGB)
+        rgb_image = self._preprocess(image)
         
         # Detect faces using selected model
         face_locations = face_recognition.face_locations(
@@ -189,6 +361,62 @@ class FaceRecognitionService:
         
         return face_locations
     
+    def detect_faces_scaled(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """
+        Fast detection for live preview
+        
+        HOG cost grows with pixel count, so detect on a frame shrunk by
+        detection_scale and map the boxes back to full-frame coordinates.
+        
+        Args:
+            image: Full-size BGR frame (numpy array or cv2.UMat)
+        
+        Returns:
+            List of face locations in full-frame coordinates
+        """
+        scale = self.detection_scale
+        small = cv2.resize(image, (0, 0), fx=scale, fy=scale)
+        if isinstance(small, cv2.UMat):
+            # dlib needs host memory; download only the small frame
+            small = small.get()
+        face_locations = face_recognition.face_locations(
+            self._to_rgb(small),
+            model=self.model,
+            number_of_times_to_upsample=self.detection_upsample
+        )
+        return [
+            (int(top / scale), int(right / scale), int(bottom / scale), int(left / scale))
+            for (top, right, bottom, left) in face_locations
+        ]
+    
+    def detect_faces_batch(self, images: List[np.ndarray],
+                           batch_size: int = 8,
+                           number_of_times_to_upsample: int = 0) -> List[List[Tuple[int, int, int, int]]]:
+        """
+        Detect faces in several frames with one CNN (MMOD) call per batch
+        
+        Mini-batches amortize GPU launch overhead when dlib is built with
+        CUDA; on a CPU-only dlib the CNN detector is slow, so this falls
+        back to per-frame detect_faces().
+        
+        Args:
+            images: Frames of identical size (BGR or RGB)
+            batch_size: Frames sent to the detector per call
+            number_of_times_to_upsample: Upsampling passes (0 = fastest)
+        
+        Returns:
+            One list of (top, right, bottom, left) locations per frame
+        """
+        if not DLIB_USE_CUDA:
+            return [self.detect_faces(image) for image in images]
+        
+        rgb_images = [self._preprocess(image) for image in images]
+        return face_recognition.batch_face_locations(
+            rgb_images,
+            number_of_times_to_upsample=number_of_times_to_upsample,
+            batch_size=batch_size
+        )
+    
     def detect_single_face(self, image: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
         """
         Detect the largest/closest face in an image
@@ -249,15 +477,10 @@ class FaceRecognitionService:
             face_location: Optional pre-detected face location
         
         Returns:
-            Face encoding as numpy array (128 dimensions) or None
+            Face encoding as float32 numpy array (128 dimensions) or None
         """
-        # Convert BGR to RGB
-        if len(image.shape) == 3 and image.shape[2] == 3:
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        else:
-            rgb_image = image
-        
-        rgb_image = self._resize_image(rgb_image)
+        # Shrink + convert to RGB
+        rgb_image = self._preprocess(image)
         
         # Detect face if location not provided
         if face_location is None:
@@ -270,7 +493,8 @@ class FaceRecognitionService:
         encodings = face_recognition.face_encodings(rgb_image, [face_location])
         
         if encodings:
-            return encodings[0]
+            # dlib returns float64; float32 halves the bytes per comparison
+            return encodings[0].astype(np.float32)
         return None
     
     def generate_encodings_from_multiple_images(self, images: List[np.ndarray]) -> List[np.ndarray]:
@@ -292,8 +516,9 @@ class FaceRecognitionService:
         
         print(f"\n🧬 Generating encodings from {len(images)} images...")
         
-        for i, image in enumerate(images):
-            encoding = self.generate_encoding(image)
+        results = self.generate_encodings_batch(images)
+        
+        for i, encoding in enumerate(results):
             if encoding is not None:
                 encodings.append(encoding)
                 print(f"   ✅ Image {i+1}/{len(images)}: Encoding generated")
@@ -303,6 +528,73 @@ class FaceRecognitionService:
         print(f"\n📊 Result: {len(encodings)}/{len(images)} successful encodings")
         return encodings
     
+    def generate_encodings_batch(self, images: List[np.ndarray]) -> List[Optional[np.ndarray]]:
+        """
+        Detect one face per image, then encode every face in a single dlib call
+        
+        Args:
+            images: List of images as numpy arrays (BGR)
+        
+        Returns:
+            One float32 encoding (or None when no face was found) per image
+        """
+        rgb_images = [self._preprocess(image) for image in images]
+        
+        # Same-size frames can share CNN batches on a CUDA build
+        if DLIB_USE_CUDA and len({img.shape for img in rgb_images}) == 1:
+            all_locations = face_recognition.batch_face_locations(
+                rgb_images, number_of_times_to_upsample=0, batch_size=len(rgb_images)
+            )
+        elif len(rgb_images) >= PARALLEL_ENCODE_MIN_IMAGES and (os.cpu_count() or 1) > 1:
+            # dlib releases the GIL while detecting, so the frames overlap on threads
+            all_locations = list(_get_encode_pool().map(
+                lambda img: face_recognition.face_locations(img, model=self.model), rgb_images
+            ))
+        else:
+            all_locations = [face_recognition.face_locations(img, model=self.model) for img in rgb_images]
+        
+        found = [(i, locations[0]) for i, locations in enumerate(all_locations) if locations]
+        results: List[Optional[np.ndarray]] = [None] * len(images)
+        if not found:
+            return results
+        
+        descriptors = self._batch_descriptors(rgb_images, found)
+        if descriptors is not None:
+            for (i, _), descriptor in zip(found, descriptors):
+                results[i] = np.asarray(descriptor[0], dtype=np.float32)
+        else:
+            # dlib without the batched descriptor API
+            for i, location in found:
+                encodings = face_recognition.face_encodings(rgb_images[i], [location])
+                if encodings:
+                    results[i] = encodings[0].astype(np.float32)
+        return results
+    
+    @staticmethod
+    def _batch_descriptors(rgb_images: List[np.ndarray], found: List[Tuple[int, tuple]]) -> Optional[list]:
+        """One compute_face_descriptor() call for all faces, or None if this dlib can't batch"""
+        if not DLIB_AVAILABLE or not hasattr(dlib, 'full_object_detections'):
+            return None
+        
+        from face_recognition import api as fr_api
+        
+        # Same landmark model face_encodings() uses by default ('small')
+        batch_images = [rgb_images[i] for i, _ in found]
+        batch_shapes = [
+            dlib.full_object_detections([
+                fr_api.pose_predictor_5_point(rgb_images[i], fr_api._css_to_rect(location))
+            ])
+            for i, location in found
+        ]
+        try:
+            return fr_api.face_encoder.compute_face_descriptor(batch_images, batch_shapes, 1)
+        except TypeError as e:
+            # Older builds only bind the single-image overload; pybind11
+            # rejects the list form with this message. Anything else is a bug.
+            if 'incompatible function arguments' not in str(e):
+                raise
+            return None
+    
     def encodings_to_json(self, encodings: List[np.ndarray]) -> str:
         """
         Convert list of encodings to JSON string for database storage
@@ -313,8 +605,11 @@ class FaceRecognitionService:
         Returns:
             JSON string
         """
-        encodings_list = [enc.tolist() for enc in encodings]
-        return json.dumps(encodings_list)
+        stacked = np.asarray(encodings, dtype=np.float32).reshape(-1, 128)
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(stacked, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+        # One bulk conversion instead of a tolist() per encoding
+        return json.dumps(stacked.tolist())
     
     def json_to_encodings(self, json_string: str) -> List[np.ndarray]:
         """
@@ -324,10 +619,25 @@ class FaceRecognitionService:
             json_string: JSON string from database
         
         Returns:
-            List of numpy arrays
+            List of float32 numpy arrays
+        """
+        encodings_list = orjson.loads(json_string) if ORJSON_AVAILABLE else json.loads(json_string)
+        # One (K, 128) array; the list holds row views of it
+        return list(np.asarray(encodings_list, dtype=np.float32).reshape(-1, 128))
+    
+    def encodings_to_blob(self, encodings: List[np.ndarray]) -> bytes:
+        """
+        Convert list of encodings to raw float32 bytes (K x 128)
+        
+        Same layout as Student.face_encoding_bin; ~10x smaller than JSON
+        """
+        return np.asarray(encodings, dtype=np.float32).reshape(-1, 128).tobytes()
+    
+    def blob_to_encodings(self, blob: bytes) -> np.ndarray:
         """
-        encodings_list = json.loads(json_string)
-        return [np.array(enc) for enc in encodings_list]
+        Convert raw float32 bytes back to a (K, 128) array without parsing
+        """
+        return np.frombuffer(blob, dtype=np.float32).reshape(-1, 128)
     
     def calculate_average_encoding(self, encodings: List[np.ndarray]) -> np.ndarray:
         """
@@ -338,14 +648,66 @@ class FaceRecognitionService:
             encodings: List of face encodings
         
         Returns:
-            Single average encoding
+            Single average encoding (float32)
         """
-        return np.mean(encodings, axis=0)
+        if kernels.NUMBA_AVAILABLE:
+            stacked = encodings if isinstance(encodings, np.ndarray) else np.stack(encodings)
+            stacked = np.ascontiguousarray(stacked, dtype=np.float32)
+            if stacked.ndim == 2 and len(stacked):
+                return kernels.mean_rows(stacked)
+        # Accumulate in float64, store in float32
+        return np.mean(encodings, axis=0, dtype=np.float64).astype(np.float32)
     
     # ═══════════════════════════════════════════════════════════════
     # SECTION 3: FACE RECOGNITION / MATCHING
     # ═══════════════════════════════════════════════════════════════
     
+    # Read-only views of the current snapshot. Code that matches and then
+    # looks a row up must take self.gallery once instead of using several
+    # of these, or a reload in between could pair an index with new lists.
+    
+    @property
+    def known_face_encodings(self) -> List[np.ndarray]:
+        return self.gallery.encodings
+    
+    @property
+    def known_face_names(self) -> List[str]:
+        return self.gallery.names
+    
+    @property
+    def known_face_ids(self) -> List[int]:
+        return self.gallery.ids
+    
+    @property
+    def known_students(self) -> List[Any]:
+        return self.gallery.students
+    
+    @property
+    def known_encodings_matrix(self) -> np.ndarray:
+        return self.gallery.matrix
+    
+    @property
+    def known_face_ids_array(self) -> np.ndarray:
+        return self.gallery.ids_array
+    
+    @property
+    def face_index(self) -> FaceIndex:
+        return self.gallery.index
+    
+    def _publish_gallery(self, gallery: FaceGallery) -> None:
+        """Make a fully built snapshot visible to readers in one assignment"""
+        # Render every label first so drawing a known face is a block copy
+        sprites = {}
+        for name in gallery.names:
+            key = (name, LABEL_COLOR)
+            sprites[key] = self._name_sprites.get(key)
+            if sprites[key] is None:
+                sprites[key] = self._render_name_sprite(name, LABEL_COLOR)
+        self._name_sprites = sprites
+        
+        self.gallery = gallery
+        self._num_registered = len(gallery)
+    
     def load_registered_faces(self) -> int:
         """
         Load all registered faces from database into memory cache
@@ -366,44 +728,199 @@ class FaceRecognitionService:
         
         print("\n📂 Loading registered faces from database...")
         
-        # Clear existing cache
-        self.known_face_encodings = []
-        self.known_face_names = []
-        self.known_face_ids = []
-        self.known_students = []
+        # Readers keep using the current snapshot until the new one is complete
+        with self._gallery_write_lock:
+            signature = self._gallery_signature(Student)
+            gallery = self._load_gallery_cache(Student, signature)
+            if gallery is not None:
+                print("   ⚡ Reused stacked encodings from disk cache")
+            else:
+                gallery = self._load_gallery_from_db(Student)
+                self._save_gallery_cache(signature, gallery)
+            
+            self._publish_gallery(gallery)
         
-        # Load active students from database
-        students = Student.objects.filter(is_active=True)
+        print(f"\n✅ Loaded {len(gallery)} registered faces into cache")
+        print(f"   Index backend: {gallery.index.backend}")
+        return len(gallery)
+    
+    def add_registered_face(self, student) -> bool:
+        """
+        Append one newly registered student to the loaded gallery
         
+        Avoids a full reload for the common case of a single registration.
+        Returns False when the student is inactive or has no encodings.
+        """
+        if not student.is_active:
+            return False
+        encodings = student.get_face_encodings()
+        if not len(encodings):
+            return False
+        
+        avg_encoding = np.asarray(self.calculate_average_encoding(encodings), dtype=np.float32)
+        
+        with self._gallery_write_lock:
+            current = self.gallery
+            if student.id in current.ids:
+                # A reload that ran after the commit already picked it up
+                return True
+            # Build the grown index and lists aside, then swap the snapshot
+            index = current.index.extended(avg_encoding)
+            self._publish_gallery(FaceGallery(
+                index.matrix, current.ids + [student.id], current.students + [student], index=index,
+            ))
+        
+        print(f"   ✅ Added to cache: {student.name} ({len(encodings)} encodings)")
+        return True
+    
+    def _load_gallery_from_db(self, Student) -> FaceGallery:
+        """Average every active student's encodings and stack them into one matrix"""
+        # Load active students from database (binary encodings, skip the JSON copy)
+        students = Student.objects.filter(is_active=True).select_related('department').defer('face_encoding')
+        
+        averages, ids, loaded = [], [], []
         for student in students:
             try:
-                # Parse encodings from JSON
-                encodings = self.json_to_encodings(student.face_encoding)
+                # (K, 128) float32 view over the stored bytes
+                encodings = student.get_face_encodings()
                 
-                if encodings:
+                if len(encodings):
                     # Calculate average encoding (Level 1 Optimization)
                     avg_encoding = self.calculate_average_encoding(encodings)
                     
-                    # Add to cache
-                    self.known_face_encodings.append(avg_encoding)
-                    self.known_face_names.append(student.name)
-                    self.known_face_ids.append(student.id)
-                    self.known_students.append(student)
+                    # Add to the snapshot being built
+                    averages.append(avg_encoding)
+                    ids.append(student.id)
+                    loaded.append(student)
                     
                     print(f"   ✅ Loaded: {student.name} ({len(encodings)} encodings)")
                     
             except Exception as e:
                 print(f"   ⚠️ Error loading {student.name}: {e}")
         
-        print(f"\n✅ Loaded {len(self.known_face_encodings)} registered faces into cache")
-        return len(self.known_face_encodings)
+        # Stack the gallery once so matching is a single vectorized pass
+        if averages:
+            matrix = np.ascontiguousarray(np.vstack(averages), dtype=np.float32)
+        else:
+            matrix = EMPTY_GALLERY_MATRIX
+        return FaceGallery(matrix, ids, loaded, hnsw_min_size=self.index_hnsw_min_size)
+    
+    # ───────────────────────────────────────────────────────────────
+    # Disk cache: one .npz holding the stacked gallery, its row -> student
+    # ids and the signature, so a reader can never pair mismatched parts
+    # ───────────────────────────────────────────────────────────────
+    
+    def _gallery_cache_path(self) -> Optional[str]:
+        """Path of the gallery .npz, or None when not configured"""
+        if not DJANGO_SETTINGS_AVAILABLE:
+            return None
+        try:
+            cache_dir = getattr(settings, 'FACE_GALLERY_CACHE_DIR', None)
+        except Exception:
+            return None
+        if not cache_dir:
+            return None
+        return os.path.join(cache_dir, 'gallery.npz')
+    
+    def _gallery_signature(self, Student) -> List[Any]:
+        """Changes whenever an active student is added, removed, toggled or edited"""
+        from django.db.models import Count, Max, Q
+        
+        stats = Student.objects.aggregate(
+            active=Count('id', filter=Q(is_active=True)),
+            latest=Max('updated_at'),
+        )
+        latest = stats['latest'].isoformat() if stats['latest'] else None
+        return [stats['active'], latest]
+    
+    def _load_gallery_cache(self, Student, signature: List[Any]) -> Optional[FaceGallery]:
+        """Gallery from the disk cache; None if missing or stale"""
+        path = self._gallery_cache_path()
+        if path is None:
+            return None
+        
+        try:
+            with np.load(path, allow_pickle=False) as cached:
+                if json.loads(str(cached['signature'])) != signature:
+                    return None
+                ids = cached['ids'].tolist()
+                matrix = np.ascontiguousarray(cached['matrix'], dtype=np.float32)
+            if matrix.shape != (len(ids), 128):
+                return None
+            
+            students = Student.objects.select_related('department').defer(
+                'face_encoding', 'face_encoding_bin'
+            ).in_bulk(ids)
+            if len(students) != len(ids):
+                return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+        
+        return FaceGallery(
+            matrix, ids, [students[student_id] for student_id in ids],
+            hnsw_min_size=self.index_hnsw_min_size,
+        )
+    
+    def _save_gallery_cache(self, signature: List[Any], gallery: FaceGallery) -> None:
+        """
+        Write the stacked gallery for the next startup
+        
+        Every writer (web workers, door system, CLI) gets its own temp file
+        in the cache directory, and a single os.replace() publishes matrix,
+        ids and signature together.
+        """
+        path = self._gallery_cache_path()
+        if path is None:
+            return
+        
+        tmp_path = None
+        try:
+            cache_dir = os.path.dirname(path)
+            os.makedirs(cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=cache_dir, suffix='.npz.tmp', delete=False) as f:
+                tmp_path = f.name
+                np.savez(
+                    f,
+                    matrix=np.asarray(gallery.matrix, dtype=np.float32),
+                    ids=np.asarray(gallery.ids, dtype=np.int64),
+                    signature=np.array(json.dumps(signature)),
+                )
+            os.replace(tmp_path, path)
+            tmp_path = None
+        except OSError as e:
+            print(f"   ⚠️ Could not write face gallery cache: {e}")
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
     
-    def recognize_face(self, image: np.ndarray) -> Dict[str, Any]:
+    def face_distances(self, unknown_encoding: np.ndarray) -> np.ndarray:
+        """
+        Euclidean distance from one encoding to every cached face
+        
+        Same values as face_recognition.face_distance(known_face_encodings, enc)
+        but computed against the pre-stacked float32 matrix with cached
+        squared norms, so a call is one matrix-vector product.
+        
+        Args:
+            unknown_encoding: Face encoding (128,)
+        
+        Returns:
+            (N,) float32 distances aligned with known_students
+        """
+        return self.gallery.index.distances(unknown_encoding)
+    
+    def recognize_face(self, image: np.ndarray,
+                       face_location: Optional[Tuple[int, int, int, int]] = None) -> Dict[str, Any]:
         """
         Recognize a face in an image
         
         Args:
             image: Image as numpy array (BGR)
+            face_location: Optional box from detect_faces()/detect_single_face();
+                           skips the detection pass when the caller already has it
         
         Returns:
             Dictionary with recognition result:
@@ -445,28 +962,31 @@ class FaceRecognitionService:
             'error': None
         }
         
+        # One snapshot for the whole match: index rows and lists must agree
+        gallery = self.gallery
+        
         try:
             # Check if we have registered faces
-            if not self.known_face_encodings:
+            if not len(gallery):
                 result['error'] = 'No registered faces in cache'
                 return self._finalize_result(result, start_time)
             
-            # Convert to RGB
-            rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            rgb_image = self._resize_image(rgb_image)
-            
-            # Detect face
-            face_locations = face_recognition.face_locations(rgb_image, model=self.model)
+            # Shrink + convert to RGB
+            rgb_image = self._preprocess(image)
             
-            if not face_locations:
-                result['error'] = 'No face detected'
-                return self._finalize_result(result, start_time)
-            
-            # Use the largest face
-            face_location = max(
-                face_locations,
-                key=lambda loc: (loc[2] - loc[0]) * (loc[1] - loc[3])
-            )
+            # Detect face (unless the caller already did)
+            if face_location is None:
+                face_locations = face_recognition.face_locations(rgb_image, model=self.model)
+                
+                if not face_locations:
+                    result['error'] = 'No face detected'
+                    return self._finalize_result(result, start_time)
+                
+                # Use the largest face
+                face_location = max(
+                    face_locations,
+                    key=lambda loc: (loc[2] - loc[0]) * (loc[1] - loc[3])
+                )
             result['face_location'] = face_location
             
             # Validate face
@@ -481,19 +1001,14 @@ class FaceRecognitionService:
                 result['error'] = 'Could not generate face encoding'
                 return self._finalize_result(result, start_time)
             
-            unknown_encoding = encodings[0]
+            unknown_encoding = encodings[0].astype(np.float32)
             
-            # Compare with known faces (vectorized - Level 1 Optimization)
-            face_distances = face_recognition.face_distance(
-                self.known_face_encodings,
-                unknown_encoding
-            )
+            # Best match + runner-up from the gallery index (FAISS or NumPy)
+            nearest_distances, nearest_indices = gallery.index.search(unknown_encoding, k=2)
             
-            # Find best match
-            best_match_index = np.argmin(face_distances)
-            best_distance = face_distances[best_match_index]
-            sorted_distances = np.sort(face_distances)
-            second_best_distance = float(sorted_distances[1]) if len(sorted_distances) > 1 else 1.0
+            best_match_index = int(nearest_indices[0])
+            best_distance = float(nearest_distances[0])
+            second_best_distance = float(nearest_distances[1]) if len(nearest_distances) > 1 else 1.0
             distance_gap = float(second_best_distance - best_distance)
 
             result['distance'] = float(best_distance)
@@ -504,13 +1019,13 @@ class FaceRecognitionService:
             # Accept match only if tolerance, confidence, and separation checks all pass
             is_within_tolerance = best_distance <= self.tolerance
             is_confident = result['confidence'] >= self.min_match_confidence
-            is_separated = (len(sorted_distances) == 1) or (distance_gap >= self.min_match_gap)
+            is_separated = (len(nearest_distances) == 1) or (distance_gap >= self.min_match_gap)
 
             if is_within_tolerance and is_confident and is_separated:
                 result['success'] = True
-                result['student_id'] = self.known_face_ids[best_match_index]
-                result['student_name'] = self.known_face_names[best_match_index]
-                result['student'] = self.known_students[best_match_index]
+                result['student_id'] = gallery.ids[best_match_index]
+                result['student_name'] = gallery.names[best_match_index]
+                result['student'] = gallery.students[best_match_index]
                 self.successful_recognitions += 1
             else:
                 if not is_within_tolerance:
@@ -556,9 +1071,7 @@ class FaceRecognitionService:
         
         print(f"\n📷 Opening camera {camera_index}...")
         
-        cap = cv2.VideoCapture(camera_index)
-        
-
+        cap = _open_camera(camera_index)
         
         if not cap.isOpened():
             print(f"❌ Cannot open camera (index {camera_index})")
@@ -570,19 +1083,17 @@ class FaceRecognitionService:
         
         print("✅ USB camera opened successfully")
         
-        # Set camera resolution
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        reader = _CameraReader(cap)
         
         # Warm up camera (discard first few frames)
         print("   Warming up camera...")
         for _ in range(5):
-            cap.read()
+            reader.read()
         
         # Capture frames
         print(f"   Capturing {num_frames} frame(s)...")
         for i in range(num_frames):
-            ret, frame = cap.read()
+            ret, frame = reader.read()
             if ret:
                 images.append(frame)
                 print(f"   ✅ Frame {i+1}/{num_frames} captured")
@@ -590,7 +1101,7 @@ class FaceRecognitionService:
                 print(f"   ❌ Frame {i+1}/{num_frames} failed")
             time.sleep(0.1)  # Small delay between captures
         
-        cap.release()
+        reader.release()
         print(f"📷 Camera closed. Captured {len(images)} images.")
         
         return images
@@ -624,7 +1135,7 @@ class FaceRecognitionService:
         print(f"   Images to capture: {num_images}")
         print("=" * 50)
         
-        cap = cv2.VideoCapture(safe_index)
+        cap = _open_camera(safe_index)
         
         if not cap.isOpened():
             print(f"❌ Cannot open USB camera (index {safe_index})")
@@ -634,9 +1145,6 @@ class FaceRecognitionService:
             print("   3. Close any other apps using the camera")
             return images, face_crops
         
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        
         print("\n✅ USB camera opened successfully!")
         print("\n📋 Instructions:")
         print("   1. Look at the camera")
@@ -648,6 +1156,7 @@ class FaceRecognitionService:
         
         captured = 0
         frames_without_face = 0
+        preview = None  # Reused drawing buffer
         
         while captured < num_images:
             ret, frame = cap.read()
@@ -658,12 +1167,19 @@ class FaceRecognitionService:
             # Detect face
             face_location = self.detect_single_face(frame)
             
-            # Draw rectangle on preview
-            preview = frame.copy()
+            # Draw on a persistent buffer; frame itself stays clean for capture
+            if preview is None or preview.shape != frame.shape:
+                preview = np.empty_like(frame)
+                chrome = self._preview_chrome(
+                    frame.shape, 40, 25, (50, 50, 50),
+                    "Press 'Q' to cancel | Turn head slowly for better results"
+                )
+            np.copyto(preview, frame)
             height, width = preview.shape[:2]
+            flashed = False
             
-            # Add header text
-            cv2.rectangle(preview, (0, 0), (width, 40), (50, 50, 50), -1)
+            # Header/footer bars are blitted; only the counter is drawn per frame
+            self._blit_chrome(preview, chrome)
             cv2.putText(preview, f"USB Camera | Captured: {captured}/{num_images}", 
                        (10, 28), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
             
@@ -677,8 +1193,8 @@ class FaceRecognitionService:
                     cv2.putText(preview, "Face OK! Capturing...", 
                                (left, top - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
                     
-                    # Capture this frame
-                    images.append(frame.copy())
+                    # Capture this frame (cap.read() hands out a fresh array each time)
+                    images.append(frame)
                     
                     # Crop face
                     face_crop = frame[top:bottom, left:right]
@@ -687,12 +1203,10 @@ class FaceRecognitionService:
                     captured += 1
                     print(f"   ✅ Image {captured}/{num_images} captured")
                     
-                    # Flash effect
-                    flash = np.ones_like(preview) * 255
-                    cv2.imshow('Registration - USB Camera (Press Q to cancel)', flash)
-                    cv2.waitKey(100)
-                    
-                    time.sleep(delay)
+                    # Flash effect: show the preview inverted in place; it stays on
+                    # screen through the capture delay (no blocking 100 ms wait)
+                    cv2.bitwise_not(preview, dst=preview)
+                    flashed = True
                 else:
                     # Face too small - yellow rectangle
                     cv2.rectangle(preview, (left, top), (right, bottom), (0, 255, 255), 3)
@@ -704,11 +1218,6 @@ class FaceRecognitionService:
                 cv2.putText(preview, "No face detected - Look at the camera", 
                            (50, height - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
             
-            # Add footer instructions
-            cv2.rectangle(preview, (0, height - 25), (width, height), (50, 50, 50), -1)
-            cv2.putText(preview, "Press 'Q' to cancel | Turn head slowly for better results", 
-                       (10, height - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
-            
             # Show preview
             cv2.imshow('Registration - USB Camera (Press Q to cancel)', preview)
             
@@ -717,6 +1226,9 @@ class FaceRecognitionService:
             if key == ord('q') or key == ord('Q'):
                 print("\n❌ Registration cancelled by user")
                 break
+            
+            if flashed:
+                time.sleep(delay)
         
         cap.release()
         cv2.destroyAllWindows()
@@ -762,37 +1274,49 @@ class FaceRecognitionService:
         print("   F - Toggle face detection")
         print("=" * 50)
         
-        cap = cv2.VideoCapture(safe_index)
+        cap = _open_camera(safe_index)
         
         if not cap.isOpened():
             print("❌ Cannot open USB camera")
             return
         
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        # Capture runs ahead on its own thread; detection always sees the newest frame
+        reader = _CameraReader(cap)
         
         print("\n✅ Camera opened. Press 'Q' to quit.\n")
         
         frame_count = 0
         start_time = time.time()
         detect_faces = show_face_detection
+        face_locations = []
+        overlay = None  # Reused drawing buffer (CPU path)
         
         while True:
-            ret, frame = cap.read()
+            ret, frame = reader.read()
             if not ret:
                 break
             
             frame_count += 1
-            display = frame.copy()
-            height, width = display.shape[:2]
+            if overlay is None or overlay.shape != frame.shape:
+                overlay = np.empty_like(frame)
+                chrome = self._preview_chrome(
+                    frame.shape, 35, 25, (0, 0, 0),
+                    "Q=Quit | S=Screenshot | F=Toggle Face Detection"
+                )
+            np.copyto(overlay, frame)
+            # Static header/footer bars are blitted; only the status line is drawn per frame
+            self._blit_chrome(overlay, chrome)
+            # Box and text drawing run through OpenCL when available
+            display = cv2.UMat(overlay) if self.use_opencl else overlay
             
             # Calculate FPS
             elapsed = time.time() - start_time
             fps = frame_count / elapsed if elapsed > 0 else 0
             
-            # Face detection
+            # Face detection (boxes from the last detected frame are redrawn in between)
             if detect_faces:
-                face_locations = self.detect_faces(frame)
+                if frame_count % self.detection_interval == 1 or self.detection_interval <= 1:
+                    face_locations = self.detect_faces_scaled(frame)
                 for (top, right, bottom, left) in face_locations:
                     if self.is_face_valid((top, right, bottom, left)):
                         cv2.rectangle(display, (left, top), (right, bottom), (0, 255, 0), 2)
@@ -804,16 +1328,10 @@ class FaceRecognitionService:
                                    (left, top - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 2)
             
             # Add info overlay
-            cv2.rectangle(display, (0, 0), (width, 35), (0, 0, 0), -1)
             info_text = f"USB Camera | FPS: {fps:.1f} | Face Detection: {'ON' if detect_faces else 'OFF'}"
             cv2.putText(display, info_text, (10, 25), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
             
-            # Footer
-            cv2.rectangle(display, (0, height - 25), (width, height), (0, 0, 0), -1)
-            cv2.putText(display, "Q=Quit | S=Screenshot | F=Toggle Face Detection", 
-                       (10, height - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
-            
             cv2.imshow('Live Preview - USB Camera', display)
             
             key = cv2.waitKey(1) & 0xFF
@@ -821,16 +1339,16 @@ class FaceRecognitionService:
             if key == ord('q') or key == ord('Q'):
                 break
             elif key == ord('s') or key == ord('S'):
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"screenshot_{timestamp}.jpg"
+                filename = f"screenshot_{time.time_ns()}.jpg"
                 cv2.imwrite(filename, frame)
                 print(f"📸 Screenshot saved: {filename}")
             elif key == ord('f') or key == ord('F'):
                 detect_faces = not detect_faces
+                face_locations = []
                 status = "ON" if detect_faces else "OFF"
                 print(f"🔍 Face detection: {status}")
         
-        cap.release()
+        reader.release()
         cv2.destroyAllWindows()
         print("\n✅ Camera preview closed")
     
@@ -838,6 +1356,70 @@ class FaceRecognitionService:
     # SECTION 5: UTILITY FUNCTIONS
     # ═══════════════════════════════════════════════════════════════
     
+    def _warm_up(self) -> None:
+        """
+        Run one dummy detect + encode so model loading, CUDA init and BLAS
+        thread start-up happen here instead of on the first real frame
+        """
+        if FaceRecognitionService._warmed:
+            return
+        FaceRecognitionService._warmed = True
+        try:
+            warm = np.zeros((128, 128, 3), dtype=np.uint8)
+            face_recognition.face_locations(warm, model=self.model)
+            face_recognition.face_encodings(warm, [(0, 127, 127, 0)])
+        except Exception as e:
+            print(f"⚠️ Model warm-up failed: {e}")
+    
+    def _preview_chrome(self, shape: tuple, header_height: int, footer_height: int,
+                        bar_color: Tuple[int, int, int], footer_text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Header bar + footer bar (with its fixed instructions), rendered once
+        
+        Returns:
+            (header, footer) images to blit onto each preview frame
+        """
+        key = (shape, header_height, footer_height, bar_color, footer_text)
+        chrome = self._chrome_cache.get(key)
+        if chrome is None:
+            width = shape[1]
+            header = np.empty((header_height, width) + shape[2:], dtype=np.uint8)
+            header[:] = bar_color
+            footer = np.empty((footer_height, width) + shape[2:], dtype=np.uint8)
+            footer[:] = bar_color
+            cv2.putText(footer, footer_text, (10, footer_height - 8),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.4, (200, 200, 200), 1)
+            chrome = (header, footer)
+            self._chrome_cache[key] = chrome
+        return chrome
+    
+    def _blit_chrome(self, image: np.ndarray, chrome: Tuple[np.ndarray, np.ndarray]) -> None:
+        """Copy pre-rendered bars onto the top and bottom rows of a frame"""
+        header, footer = chrome
+        image[:header.shape[0]] = header
+        image[image.shape[0] - footer.shape[0]:] = footer
+    
+    def _preprocess(self, image: np.ndarray) -> np.ndarray:
+        """
+        Prepare a BGR frame for dlib: resize first so the channel flip
+        (and its contiguous copy) only touches the smaller image
+        """
+        return self._to_rgb(self._resize_image(image))
+    
+    def _to_rgb(self, image: np.ndarray) -> np.ndarray:
+        """
+        BGR -> RGB as a channel-reversed view of the frame
+        
+        dlib needs C-contiguous memory, so the view is materialized with a
+        single copy only when it is not already contiguous.
+        """
+        if image.ndim != 3 or image.shape[2] != 3:
+            return image
+        rgb = image[..., ::-1]
+        if not rgb.flags['C_CONTIGUOUS']:
+            rgb = np.ascontiguousarray(rgb)
+        return rgb
+    
     def _resize_image(self, image: np.ndarray) -> np.ndarray:
         """
         Resize image if too large (for speed optimization)
@@ -849,14 +1431,15 @@ class FaceRecognitionService:
             scale = min(max_width / width, max_height / height)
             new_width = int(width * scale)
             new_height = int(height * scale)
-            return cv2.resize(image, (new_width, new_height))
+            return cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
         
         return image
     
     def draw_face_box(self, image: np.ndarray, 
                      face_location: Tuple[int, int, int, int],
                      name: str = None,
-                     color: Tuple[int, int, int] = (0, 255, 0)) -> np.ndarray:
+                     color: Tuple[int, int, int] = LABEL_COLOR,
+                     inplace: bool = False) -> np.ndarray:
         """
         Draw rectangle and name on image around face
         
@@ -865,27 +1448,84 @@ class FaceRecognitionService:
             face_location: (top, right, bottom, left)
             name: Name to display (optional)
             color: BGR color tuple
+            inplace: Draw straight onto image instead of a copy
+                     (use when the caller does not need the original; a
+                     non C-contiguous view is copied once, so use the
+                     returned image)
         
         Returns:
-            Image with drawing
+            Image with drawing. Without inplace this is the service's
+            reusable scratch buffer, overwritten by the next call; copy it
+            if it must outlive that.
         """
-        result = image.copy()
-        top, right, bottom, left = face_location
-        
-        # Draw rectangle
-        cv2.rectangle(result, (left, top), (right, bottom), color, 2)
-        
-        # Draw name
+        if inplace:
+            # OpenCV cannot draw into strided views; it would copy internally
+            result = image if image.flags['C_CONTIGUOUS'] else np.ascontiguousarray(image)
+        else:
+            buf = self._annot_buf
+            if buf is None or buf.shape != image.shape or buf.dtype != image.dtype:
+                buf = self._annot_buf = np.empty_like(image)
+            np.copyto(buf, image)
+            result = buf
         if name:
-            cv2.rectangle(result, (left, bottom - 25), (right, bottom), color, cv2.FILLED)
-            cv2.putText(result, name, (left + 6, bottom - 6), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+            return self._draw_box_named(result, face_location, name, color)
+        return self._draw_box_only(result, face_location, color)
+    
+    def _draw_box_only(self, image: np.ndarray,
+                       face_location: Tuple[int, int, int, int],
+                       color: Tuple[int, int, int] = LABEL_COLOR) -> np.ndarray:
+        """Face rectangle only, drawn onto image (for callers with no label)"""
+        top, right, bottom, left = face_location
+        cv2.rectangle(image, (left, top), (right, bottom), color, 2)
+        return image
+    
+    def _draw_box_named(self, image: np.ndarray,
+                        face_location: Tuple[int, int, int, int],
+                        name: str,
+                        color: Tuple[int, int, int] = LABEL_COLOR) -> np.ndarray:
+        """Face rectangle plus name bar, drawn onto image"""
+        top, right, bottom, left = face_location
+        cv2.rectangle(image, (left, top), (right, bottom), color, 2)
         
-        return result
+        # Fill the label bar, then copy in the pre-rendered text
+        height, width = image.shape[:2]
+        y0, y1 = max(bottom - LABEL_HEIGHT, 0), min(bottom + 1, height)
+        x0 = max(left, 0)
+        if y0 < y1 and x0 < width:
+            image[y0:y1, x0:min(right + 1, width)] = color
+            # Measured once per name; a sprite wider than the face box
+            # extends the bar (it carries the bar color as background)
+            sprite = self._name_sprite(name, color)
+            sy, sx = y0 - (bottom - LABEL_HEIGHT), x0 - left
+            rows = min(y1 - y0, sprite.shape[0] - sy)
+            cols = min(width - x0, sprite.shape[1] - sx)
+            if rows > 0 and cols > 0:
+                image[y0:y0 + rows, x0:x0 + cols] = sprite[sy:sy + rows, sx:sx + cols]
+        return image
+    
+    def _name_sprite(self, name: str, color: Tuple[int, int, int]) -> np.ndarray:
+        """White name text on a color bar, rasterized once per (name, color)"""
+        key = (name, tuple(color))
+        sprite = self._name_sprites.get(key)
+        if sprite is None:
+            sprite = self._render_name_sprite(name, color)
+            self._name_sprites[key] = sprite
+        return sprite
+    
+    @staticmethod
+    def _render_name_sprite(name: str, color: Tuple[int, int, int]) -> np.ndarray:
+        (text_w, _), _ = cv2.getTextSize(name, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 1)
+        sprite = np.empty((LABEL_HEIGHT, text_w + 12, 3), dtype=np.uint8)
+        sprite[:] = color
+        cv2.putText(sprite, name, (6, LABEL_HEIGHT - 6),
+                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
+        return sprite
     
     def save_captured_image(self, image: np.ndarray, 
                            filename: str = None,
-                           folder: str = 'captured') -> str:
+                           folder: str = 'captured',
+                           quality: int = 85,
+                           ext: str = '.jpg') -> str:
         """
         Save captured image to media folder
         
@@ -893,32 +1533,47 @@ class FaceRecognitionService:
             image: Image to save
             filename: Optional filename (auto-generated if not provided)
             folder: Subfolder in media directory
+            quality: JPEG quality (OpenCV's default of 95 costs more CPU and disk)
+            ext: '.jpg' (default) or '.bmp' for raw frames that will be
+                 re-encoded later - BMP is uncompressed, so no DCT/Huffman work
         
         Returns:
             Path to saved image
         """
-        if filename is None:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"capture_{timestamp}.jpg"
+        # Strided slices (crops, channel views) would be copied inside the binding
+        if not image.flags['C_CONTIGUOUS']:
+            image = np.ascontiguousarray(image)
         
-        # Create folder if needed
-        if DJANGO_SETTINGS_AVAILABLE:
-            try:
-                save_folder = os.path.join(settings.MEDIA_ROOT, folder)
-            except:
-                save_folder = os.path.join('media', folder)
+        if filename is None:
+            # Nanosecond stamp: unique even for burst captures in the same second
+            filename = f"capture_{time.time_ns()}{ext}"
         else:
-            save_folder = os.path.join('media', folder)
+            # An explicit filename decides the format
+            ext = os.path.splitext(filename)[1].lower() or ext
         
-        os.makedirs(save_folder, exist_ok=True)
-        
-        # Save image
-        filepath = os.path.join(save_folder, filename)
-        cv2.imwrite(filepath, image)
-        print(f"💾 Image saved: {filepath}")
+        # Encode in memory, then write the finished buffer in one go
+        filepath = os.path.join(self._save_folder(folder), filename)
+        if ext in ('.jpg', '.jpeg'):
+            ok, buffer = cv2.imencode(ext, image, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+        else:
+            ok, buffer = cv2.imencode(ext, image)
+        if not ok:
+            raise ValueError(f"Could not encode image for {filepath}")
+        with open(filepath, 'wb') as f:
+            f.write(buffer)
+        logger.debug("Image saved: %s", filepath)
         
         return filepath
     
+    def _save_folder(self, folder: str) -> str:
+        """Resolve + create each media subfolder once"""
+        save_folder = self._save_dirs.get(folder)
+        if save_folder is None:
+            save_folder = os.path.join(_MEDIA_ROOT, folder)
+            os.makedirs(save_folder, exist_ok=True)
+            self._save_dirs[folder] = save_folder
+        return save_folder
+    
     def get_performance_stats(self) -> Dict[str, Any]:
         """
         Get performance statistics
@@ -935,7 +1590,7 @@ class FaceRecognitionService:
             'successful_recognitions': self.successful_recognitions,
             'success_rate': round(success_rate, 2),
             'last_recognition_time_ms': round(self.last_recognition_time, 2),
-            'registered_faces': len(self.known_face_encodings),
+            'registered_faces': self._num_registered,
             'tolerance': self.tolerance,
             'model': self.model,
             'camera_index': self.camera_index
@@ -953,12 +1608,31 @@ class FaceRecognitionService:
         return self.load_registered_faces()
 
 
+# ═══════════════════════════════════════════════════════════════════
+# PARALLEL DETECTION POOL
+# ═══════════════════════════════════════════════════════════════════
+
+# Created on first use and kept for the life of the process: no fork of the
+# threaded web server and no per-registration model reload
+_encode_pool: Optional[ThreadPoolExecutor] = None
+_encode_pool_lock = threading.Lock()
+
+def _get_encode_pool() -> ThreadPoolExecutor:
+    global _encode_pool
+    if _encode_pool is None:
+        with _encode_pool_lock:
+            if _encode_pool is None:
+                _encode_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix='face-encode')
+    return _encode_pool
+
+
 # ═══════════════════════════════════════════════════════════════════
 # SINGLETON INSTANCE
 # ═══════════════════════════════════════════════════════════════════
 
 # Global instance for use across the application
 _face_service_instance: Optional[FaceRecognitionService] = None
+_face_service_lock = threading.Lock()
 
 def get_face_recognition_service() -> FaceRecognitionService:
     """
@@ -972,17 +1646,105 @@ def get_face_recognition_service() -> FaceRecognitionService:
     """
     global _face_service_instance
     
+    # Fast path: no lock once the service exists
+    service = _face_service_instance
+    if service is not None:
+        return service
+    
+    # Double-checked so concurrent first requests build (and load) only one service
+    with _face_service_lock:
+        if _face_service_instance is None:
+            service = FaceRecognitionService()
+            service.load_registered_faces()
+            # Publish only after the gallery is loaded
+            _face_service_instance = service
+        return _face_service_instance
+
+
+def refresh_face_service_if_loaded() -> int:
+    """
+    Refresh the singleton cache only if it has already been created
+    
+    Used by model signals so saving a Student never forces a cold load.
+    """
     if _face_service_instance is None:
-        _face_service_instance = FaceRecognitionService()
-        _face_service_instance.load_registered_faces()
+        return 0
+    return _face_service_instance.refresh_cache()
+
+
+# Background refresh state: one worker at a time, later requests coalesce
+_refresh_state_lock = threading.Lock()
+_refresh_pending = False
+_refresh_running = False
+
+def refresh_face_service_in_background() -> bool:
+    """
+    Schedule refresh_face_service_if_loaded() on a daemon thread
     
-    return _face_service_instance
+    A burst of Student saves triggers at most one extra reload after the
+    one in progress. Returns False when no service is loaded.
+    """
+    global _refresh_pending, _refresh_running
+    if _face_service_instance is None:
+        return False
+    
+    with _refresh_state_lock:
+        _refresh_pending = True
+        if _refresh_running:
+            return True
+        _refresh_running = True
+    
+    threading.Thread(target=_refresh_worker, name='face-refresh', daemon=True).start()
+    return True
+
+
+def _refresh_worker():
+    from django.db import close_old_connections
+    
+    global _refresh_pending, _refresh_running
+    while True:
+        with _refresh_state_lock:
+            if not _refresh_pending:
+                _refresh_running = False
+                return
+            _refresh_pending = False
+        # Off the request cycle: don't let this thread keep a stale connection
+        close_old_connections()
+        try:
+            refresh_face_service_if_loaded()
+        except Exception as e:
+            logger.exception("⚠️ Face cache refresh failed: %s", e)
+        finally:
+            close_old_connections()
+
+
+def add_face_to_service_if_loaded(student) -> bool:
+    """
+    Add a newly created student to the loaded gallery, or schedule a reload
+    
+    Falls back to a background reload while one is already running (it
+    may have read the database before this student was committed).
+    """
+    service = _face_service_instance
+    if service is None:
+        return False
+    
+    with _refresh_state_lock:
+        busy = _refresh_running
+    if not busy:
+        try:
+            # False means inactive or no encodings: a reload would skip it too
+            return service.add_registered_face(student)
+        except Exception as e:
+            logger.warning("⚠️ Incremental face add failed: %s", e)
+    return refresh_face_service_in_background()
 
 
 def reset_face_service():
     """Reset the singleton instance (useful for testing)"""
     global _face_service_instance
-    _face_service_instance = None
+    with _face_service_lock:
+        _face_service_instance = None
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -1047,9 +1809,9 @@ if __name__ == '__main__':
                 if encoding is not None:
                     print(f"   ✅ Encoding generated: {encoding.shape}")
                 
-                # Show image with face
-                for (top, right, bottom, left) in faces:
-                    cv2.rectangle(image, (left, top), (right, bottom), (0, 255, 0), 2)
+                # Show image with face (throwaway frame, so draw in place)
+                for face_location in faces:
+                    service._draw_box_only(image, face_location)
                 
                 cv2.imshow('Detected Face - Press any key', image)
                 cv2.waitKey(0)
@@ -1085,6 +1847,10 @@ if __name__ == '__main__':
                 loaded_encodings = service.json_to_encodings(json_data)
                 print(f"   Loaded back: {len(loaded_encodings)} encodings")
                 
+                # Binary form stored alongside (Student.face_encoding_bin)
+                blob = service.encodings_to_blob(encodings)
+                print(f"   Binary size: {len(blob)} bytes")
+                
                 # Calculate average
                 avg = service.calculate_average_encoding(loaded_encodings)
                 print(f"   Average encoding shape: {avg.shape}")
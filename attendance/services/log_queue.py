@@ -0,0 +1,148 @@
+"""
+System Log Queue
+================
+Buffers SystemLog rows in memory and writes them in batches with
+bulk_create from a background thread, so hot loops (door system,
+recognition) never wait on a per-row INSERT + commit. On PostgreSQL
+batches are streamed with COPY instead of a multi-row INSERT.
+
+Usage:
+    from attendance.services.log_queue import enqueue_log
+
+    enqueue_log('info', 'Door unlocked', details='Main Door')
+"""
+
+import atexit
+import csv
+import io
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Rows written per INSERT, and how long a batch may wait to fill up
+BATCH_SIZE = 500
+FLUSH_INTERVAL_SECONDS = 0.1
+
+# A failed batch is retried once on a fresh connection after this pause
+# (e.g. SQLite "database is locked" while the door loop writes)
+RETRY_DELAY_SECONDS = 0.5
+
+_log_queue: "queue.Queue" = queue.Queue()
+_worker: threading.Thread = None
+_worker_lock = threading.Lock()
+
+
+def enqueue_log(log_type, message, details=None):
+    """Queue a SystemLog row; it is written by the background flusher"""
+    from attendance.models import SystemLog
+
+    _ensure_worker()
+    # timestamp default is evaluated here, so queued rows keep event time
+    _log_queue.put(SystemLog(log_type=log_type, message=message, details=details))
+
+
+def flush():
+    """Synchronously write everything currently queued"""
+    while True:
+        batch = _collect_batch(block=False)
+        if not batch:
+            return
+        _write_batch(batch)
+
+
+def _ensure_worker():
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name='systemlog-flusher', daemon=True)
+            _worker.start()
+
+
+def _collect_batch(block=True):
+    """Take up to BATCH_SIZE rows, waiting at most FLUSH_INTERVAL_SECONDS after the first"""
+    batch = []
+    try:
+        batch.append(_log_queue.get() if block else _log_queue.get_nowait())
+    except queue.Empty:
+        return batch
+
+    deadline = time.monotonic() + FLUSH_INTERVAL_SECONDS
+    while len(batch) < BATCH_SIZE:
+        remaining = deadline - time.monotonic()
+        try:
+            if block and remaining > 0:
+                batch.append(_log_queue.get(timeout=remaining))
+            else:
+                batch.append(_log_queue.get_nowait())
+        except queue.Empty:
+            break
+    return batch
+
+
+def _write_batch(batch):
+    from django.db import close_old_connections, connection
+    from attendance.caching import bump_model_version
+    from attendance.models import SystemLog
+
+    # The flusher lives outside the request cycle, so expire stale or
+    # over-age connections (server restart, CONN_MAX_AGE) ourselves
+    close_old_connections()
+    try:
+        for attempt in (1, 2):
+            try:
+                if connection.vendor == 'postgresql':
+                    _copy_batch(connection, batch)
+                else:
+                    SystemLog.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+                break
+            except Exception:
+                if attempt == 2:
+                    logger.exception("⚠️ Failed to write %d system log(s)", len(batch))
+                    return
+                # Drop the possibly broken connection; the retry reconnects
+                connection.close()
+                time.sleep(RETRY_DELAY_SECONDS)
+        # Bulk writes send no post_save, so invalidate cached views here
+        bump_model_version(SystemLog)
+    finally:
+        close_old_connections()
+
+
+def _copy_batch(connection, batch):
+    """Stream a batch into SystemLog with PostgreSQL COPY (psycopg 2 or 3)"""
+    from attendance.models import SystemLog
+
+    # QUOTE_NONNUMERIC quotes every string and leaves None bare, which
+    # COPY's CSV format reads as NULL (so details=None stays NULL)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+    for log in batch:
+        writer.writerow([log.timestamp.isoformat(), log.log_type, log.message, log.details])
+    buffer.seek(0)
+
+    sql = (
+        f"COPY {SystemLog._meta.db_table} (timestamp, log_type, message, details) "
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+    with connection.cursor() as cursor:
+        raw_cursor = cursor.cursor
+        if hasattr(raw_cursor, 'copy_expert'):
+            raw_cursor.copy_expert(sql, buffer)
+        else:
+            with raw_cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def _run():
+    while True:
+        batch = _collect_batch(block=True)
+        if batch:
+            _write_batch(batch)
+
+
+atexit.register(flush)
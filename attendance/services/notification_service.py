@@ -4,17 +4,41 @@ Notification Service - Email & Telegram
 ═══════════════════════════════════════════════════════════════════
 """
 
+import logging
+import mimetypes
 import os
 import smtplib
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
+from types import SimpleNamespace
 from django.conf import settings
-from django.core.mail import send_mail, EmailMultiAlternatives
-from django.template.loader import render_to_string
-from django.utils.html import strip_tags
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections
+from django.db.models import Count
+from django.template.loader import get_template
+from django.test.signals import setting_changed
 from django.utils import timezone
 
+# Optional: stream photo uploads from disk instead of building the body in memory
+try:
+    from requests_toolbelt.multipart.encoder import MultipartEncoder
+    MULTIPART_STREAMING = True
+except ImportError:
+    MULTIPART_STREAMING = False
+
+# Optional: httpx with HTTP/2 multiplexes concurrent Telegram calls over one connection
+try:
+    import httpx
+    import h2  # noqa: F401 - required by httpx for http2=True
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+from attendance.caching import versioned_get_or_set
 from attendance.tasks import (
     send_attendance_notification_task,
     send_daily_report_task,
@@ -23,30 +47,174 @@ from attendance.tasks import (
 )
 
 
+# ═══════════════════════════════════════════════════════════════════
+# LOGGING
+# ═══════════════════════════════════════════════════════════════════
+
+# Handlers come from settings.LOGGING (queued console output)
+logger = logging.getLogger(__name__)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# SETTINGS (read once, not on every notification)
+# ═══════════════════════════════════════════════════════════════════
+
+_conf = SimpleNamespace()
+
+
+def _load_settings(**kwargs):
+    """Snapshot the notification settings into _conf"""
+    notifications = bool(getattr(settings, 'NOTIFICATIONS_ENABLED', False))
+    _conf.email_enabled = notifications and bool(getattr(settings, 'EMAIL_NOTIFICATIONS', False))
+    _conf.admin_email = getattr(settings, 'ADMIN_EMAIL', None)
+    _conf.from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', None)
+    _conf.telegram_token = getattr(settings, 'TELEGRAM_BOT_TOKEN', None)
+    _conf.telegram_chat_id = getattr(settings, 'TELEGRAM_CHAT_ID', None)
+    _conf.telegram_enabled = bool(
+        notifications and
+        getattr(settings, 'TELEGRAM_NOTIFICATIONS', False) and
+        _conf.telegram_token and
+        _conf.telegram_chat_id
+    )
+    _conf.telegram_cooldown_seconds = int(getattr(settings, 'TELEGRAM_FAIL_COOLDOWN_SECONDS', 300))
+    _conf.telegram_timeout = int(getattr(settings, 'TELEGRAM_REQUEST_TIMEOUT', 10))
+    _conf.telegram_attempts = int(getattr(settings, 'TELEGRAM_RETRY_ATTEMPTS', 3))
+    _conf.telegram_retry_delay = float(getattr(settings, 'TELEGRAM_RETRY_DELAY_SECONDS', 1.0))
+    _conf.use_celery = bool(getattr(settings, 'CELERY_NOTIFICATIONS_ENABLED', False))
+    # Bot API endpoints depend only on the token
+    api_base = f"https://api.telegram.org/bot{_conf.telegram_token}"
+    _conf.telegram_message_url = f"{api_base}/sendMessage"
+    _conf.telegram_photo_url = f"{api_base}/sendPhoto"
+
+
+_load_settings()
+# override_settings() in tests fires this
+setting_changed.connect(_load_settings, dispatch_uid='notification_service_settings')
+
+
 # ═══════════════════════════════════════════════════════════════════
 # EMAIL NOTIFICATIONS
 # ═══════════════════════════════════════════════════════════════════
 
+# Upper bound on how stale the cached active-student total may get
+ACTIVE_COUNT_CACHE_SECONDS = 300
+
+# Compiled templates/emails/<name>.html + .txt pairs, loaded on first use
+_EMAIL_TEMPLATES = {}
+
+# Document shell shared by every HTML email; the templates hold only the body
+_EMAIL_SHELL_OPEN = '<html>\n<body style="font-family: Arial, sans-serif; padding: 20px;">\n'
+_EMAIL_SHELL_CLOSE = '</body>\n</html>\n'
+
+
+def _render_email(name, context):
+    """Render the (html, plain text) bodies of an email template pair"""
+    templates = _EMAIL_TEMPLATES.get(name)
+    if templates is None:
+        templates = _EMAIL_TEMPLATES[name] = (
+            get_template(f'emails/{name}.html'),
+            get_template(f'emails/{name}.txt'),
+        )
+    html_template, text_template = templates
+    html = ''.join((_EMAIL_SHELL_OPEN, html_template.render(context), _EMAIL_SHELL_CLOSE))
+    return html, text_template.render(context)
+
+
+def compute_daily_stats(date=None, with_names=True):
+    """
+    Attendance numbers for one day, shared by the email and Telegram reports
+
+    Two queries: the active-student count, plus either the distinct
+    present (id, name) pairs (with_names) or just COUNT(DISTINCT student).
+    """
+    from attendance.models import Student, Attendance
+
+    date = date or timezone.now().date()
+    present_today = Attendance.objects.filter(
+        timestamp__date=date,
+        entry_type='success',
+        student__isnull=False
+    )
+    if with_names:
+        rows = list(present_today.order_by().values_list('student_id', 'student__name').distinct())
+        present = len(rows)
+        present_names = [name for _, name in rows]
+    else:
+        present = present_today.aggregate(present=Count('student', distinct=True))['present']
+        present_names = None
+    # Changes only on registration/deactivation; the Student version key tracks that
+    total = versioned_get_or_set(
+        Student, 'active_student_count', Student.objects.filter(is_active=True).count, ACTIVE_COUNT_CACHE_SECONDS
+    )
+    return {
+        'date': date,
+        'total': total,
+        'present': present,
+        'absent': total - present,
+        'present_names': present_names,
+    }
+
+
 class EmailNotificationService:
     """Handle all email notifications"""
+
+    # One SMTP session (TLS + AUTH done once) shared by every sender
+    _connection = None
+    _connection_lock = threading.RLock()
     
     @staticmethod
     def is_enabled():
         """Check if email notifications are enabled"""
-        return bool(
-            getattr(settings, 'EMAIL_NOTIFICATIONS', False) and
-            getattr(settings, 'NOTIFICATIONS_ENABLED', False)
-        )
+        return _conf.email_enabled
 
     @staticmethod
     def _log_email_error(prefix, error):
         if isinstance(error, smtplib.SMTPAuthenticationError):
-            print(
-                f"   ❌ {prefix}: SMTP auth failed. "
-                "Use Gmail App Password (16 chars), not account password."
+            logger.error(
+                "❌ %s: SMTP auth failed. "
+                "Use Gmail App Password (16 chars), not account password.", prefix
             )
             return
-        print(f"   ❌ {prefix}: {error}")
+        logger.error("❌ %s: %s", prefix, error)
+    
+    @staticmethod
+    def _get_connection():
+        """Shared mail backend connection, created on first use"""
+        with EmailNotificationService._connection_lock:
+            if EmailNotificationService._connection is None:
+                EmailNotificationService._connection = get_connection(fail_silently=False)
+            return EmailNotificationService._connection
+
+    @staticmethod
+    def _send(messages):
+        """
+        Send messages over the shared connection
+
+        The session stays open between sends; if the server has dropped
+        it (idle timeout), reconnect once and retry.
+        """
+        # One SMTP session is strictly sequential, so senders take turns
+        with EmailNotificationService._connection_lock:
+            connection = EmailNotificationService._get_connection()
+            try:
+                connection.open()
+                return connection.send_messages(messages)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                connection.close()
+                connection.open()
+                return connection.send_messages(messages)
+
+    @staticmethod
+    def _build_message(subject, plain_message, html_message, to):
+        email = EmailMultiAlternatives(
+            subject=subject,
+            body=plain_message,
+            from_email=_conf.from_email,
+            to=to,
+            connection=EmailNotificationService._get_connection(),
+        )
+        email.attach_alternative(html_message, "text/html")
+        return email
     
     @staticmethod
     def send_attendance_notification(student, timestamp=None):
@@ -55,7 +223,7 @@ class EmailNotificationService:
             return False
         
         if not student.email:
-            print(f"   ℹ️ No email for {student.name}")
+            logger.info("ℹ️ No email for %s", student.name)
             return False
         
         try:
@@ -63,58 +231,18 @@ class EmailNotificationService:
             
             subject = f"✅ Attendance Marked - {timestamp.strftime('%d %b %Y')}"
             
-            html_message = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; padding: 20px;">
-                <div style="max-width: 500px; margin: 0 auto; background: #f8f9fa; padding: 30px; border-radius: 15px;">
-                    <h2 style="color: #2ec4b6; margin-bottom: 20px;">✅ Attendance Confirmed</h2>
-                    
-                    <p>Hello <strong>{student.name}</strong>,</p>
-                    
-                    <p>Your attendance has been marked successfully.</p>
-                    
-                    <div style="background: white; padding: 20px; border-radius: 10px; margin: 20px 0;">
-                        <table style="width: 100%;">
-                            <tr>
-                                <td style="padding: 8px 0; color: #666;">📅 Date:</td>
-                                <td style="padding: 8px 0;"><strong>{timestamp.strftime('%d %B %Y')}</strong></td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; color: #666;">⏰ Time:</td>
-                                <td style="padding: 8px 0;"><strong>{timestamp.strftime('%I:%M %p')}</strong></td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; color: #666;">🆔 Roll Number:</td>
-                                <td style="padding: 8px 0;"><strong>{student.roll_number}</strong></td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; color: #666;">📍 Location:</td>
-                                <td style="padding: 8px 0;"><strong>Main Entrance</strong></td>
-                            </tr>
-                        </table>
-                    </div>
-                    
-                    <p style="color: #666; font-size: 12px; margin-top: 30px;">
-                        This is an automated message from Smart Attendance System.<br>
-                        Please do not reply to this email.
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
-            
-            plain_message = strip_tags(html_message)
+            html_message, plain_message = _render_email('attendance', {
+                'name': student.name,
+                'roll_number': student.roll_number,
+                'date': timestamp.strftime('%d %B %Y'),
+                'time': timestamp.strftime('%I:%M %p'),
+            })
             
-            send_mail(
-                subject=subject,
-                message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[student.email],
-                html_message=html_message,
-                fail_silently=False
-            )
+            EmailNotificationService._send([
+                EmailNotificationService._build_message(subject, plain_message, html_message, [student.email])
+            ])
             
-            print(f"   📧 Email sent to {student.email}")
+            logger.info("📧 Email sent to %s", student.email)
             return True
             
         except Exception as e:
@@ -133,58 +261,17 @@ class EmailNotificationService:
         try:
             subject = "🎉 Welcome to Smart Attendance System"
             
-            html_message = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; padding: 20px;">
-                <div style="max-width: 500px; margin: 0 auto; background: linear-gradient(135deg, #4361ee 0%, #3f37c9 100%); padding: 30px; border-radius: 15px; color: white;">
-                    <h2 style="margin-bottom: 20px;">🎉 Welcome!</h2>
-                    
-                    <p>Hello <strong>{student.name}</strong>,</p>
-                    
-                    <p>Your account has been created in the Smart Attendance System.</p>
-                </div>
-                
-                <div style="max-width: 500px; margin: 20px auto; background: #f8f9fa; padding: 30px; border-radius: 15px;">
-                    <h3 style="color: #333;">🔐 Your Login Credentials</h3>
-                    
-                    <div style="background: white; padding: 20px; border-radius: 10px; margin: 15px 0;">
-                        <table style="width: 100%;">
-                            <tr>
-                                <td style="padding: 10px 0; color: #666;">Username:</td>
-                                <td style="padding: 10px 0;"><code style="background: #e9ecef; padding: 5px 10px; border-radius: 5px;">{username}</code></td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 10px 0; color: #666;">Password:</td>
-                                <td style="padding: 10px 0;"><code style="background: #e9ecef; padding: 5px 10px; border-radius: 5px;">{password}</code></td>
-                            </tr>
-                        </table>
-                    </div>
-                    
-                    <p style="color: #dc3545; font-size: 14px;">
-                        ⚠️ Please keep your credentials safe and do not share with anyone.
-                    </p>
-                    
-                    <p style="color: #666; font-size: 12px; margin-top: 20px;">
-                        Smart Attendance System<br>
-                        The Islamia University of Bahawalpur
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
-            
-            plain_message = strip_tags(html_message)
+            html_message, plain_message = _render_email('welcome', {
+                'name': student.name,
+                'username': username,
+                'password': password,
+            })
             
-            send_mail(
-                subject=subject,
-                message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[student.email],
-                html_message=html_message,
-                fail_silently=False
-            )
+            EmailNotificationService._send([
+                EmailNotificationService._build_message(subject, plain_message, html_message, [student.email])
+            ])
             
-            print(f"   📧 Welcome email sent to {student.email}")
+            logger.info("📧 Welcome email sent to %s", student.email)
             return True
             
         except Exception as e:
@@ -197,7 +284,7 @@ class EmailNotificationService:
         if not EmailNotificationService.is_enabled():
             return False
         
-        admin_email = getattr(settings, 'ADMIN_EMAIL', None)
+        admin_email = _conf.admin_email
         if not admin_email:
             return False
         
@@ -206,61 +293,23 @@ class EmailNotificationService:
             
             subject = "⚠️ Unknown Person Detected - Smart Attendance"
             
-            html_message = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; padding: 20px;">
-                <div style="max-width: 500px; margin: 0 auto; background: #fff3cd; padding: 30px; border-radius: 15px; border-left: 5px solid #ffc107;">
-                    <h2 style="color: #856404; margin-bottom: 20px;">⚠️ Security Alert</h2>
-                    
-                    <p>An <strong>unknown person</strong> was detected by the attendance system.</p>
-                    
-                    <div style="background: white; padding: 20px; border-radius: 10px; margin: 20px 0;">
-                        <table style="width: 100%;">
-                            <tr>
-                                <td style="padding: 8px 0; color: #666;">📅 Date:</td>
-                                <td style="padding: 8px 0;"><strong>{timestamp.strftime('%d %B %Y')}</strong></td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; color: #666;">⏰ Time:</td>
-                                <td style="padding: 8px 0;"><strong>{timestamp.strftime('%I:%M:%S %p')}</strong></td>
-                            </tr>
-                            <tr>
-                                <td style="padding: 8px 0; color: #666;">📍 Location:</td>
-                                <td style="padding: 8px 0;"><strong>Main Entrance</strong></td>
-                            </tr>
-                        </table>
-                    </div>
-                    
-                    <p>Please check the system logs for more details.</p>
-                    
-                    <p style="color: #666; font-size: 12px; margin-top: 30px;">
-                        Smart Attendance System - Security Alert
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
-            
-            plain_message = strip_tags(html_message)
+            html_message, plain_message = _render_email('unknown_alert', {
+                'date': timestamp.strftime('%d %B %Y'),
+                'time': timestamp.strftime('%I:%M:%S %p'),
+            })
 
-            email = EmailMultiAlternatives(
-                subject=subject,
-                body=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[admin_email],
-            )
-            email.attach_alternative(html_message, "text/html")
+            email = EmailNotificationService._build_message(subject, plain_message, html_message, [admin_email])
 
             if image_path and os.path.exists(image_path):
                 try:
                     email.attach_file(image_path)
-                    print(f"   📎 Alert image attached: {os.path.basename(image_path)}")
+                    logger.info("📎 Alert image attached: %s", os.path.basename(image_path))
                 except Exception as attach_error:
-                    print(f"   ⚠️ Could not attach alert image: {attach_error}")
+                    logger.warning("⚠️ Could not attach alert image: %s", attach_error)
 
-            email.send(fail_silently=False)
+            EmailNotificationService._send([email])
             
-            print(f"   📧 Alert sent to admin")
+            logger.info("📧 Alert sent to admin")
             return True
             
         except Exception as e:
@@ -268,89 +317,35 @@ class EmailNotificationService:
             return False
     
     @staticmethod
-    def send_daily_report(date=None):
-        """Send daily attendance report to admin"""
+    def send_daily_report(date=None, stats=None):
+        """Send daily attendance report to admin (stats from compute_daily_stats)"""
         if not EmailNotificationService.is_enabled():
             return False
         
-        admin_email = getattr(settings, 'ADMIN_EMAIL', None)
+        admin_email = _conf.admin_email
         if not admin_email:
             return False
         
         try:
-            from attendance.models import Student, Attendance
-            
-            date = date or timezone.now().date()
-            
-            # Get stats
-            total_students = Student.objects.filter(is_active=True).count()
-            present_today = Attendance.objects.filter(
-                timestamp__date=date,
-                entry_type='success'
-            ).values('student').distinct().count()
-            absent_today = total_students - present_today
-            
-            # Get list of present students
-            present_list = Attendance.objects.filter(
-                timestamp__date=date,
-                entry_type='success'
-            ).select_related('student').values_list('student__name', flat=True).distinct()
+            if stats is None or stats['present_names'] is None:
+                stats = compute_daily_stats(date or (stats and stats['date']))
+            date = stats['date']
             
             subject = f"📊 Daily Attendance Report - {date.strftime('%d %b %Y')}"
             
-            present_names = "<br>".join([f"✅ {name}" for name in present_list])
-            if not present_names:
-                present_names = "No attendance recorded"
+            html_message, plain_message = _render_email('daily_report', {
+                'date': date.strftime('%A, %d %B %Y'),
+                'present': stats['present'],
+                'absent': stats['absent'],
+                'total': stats['total'],
+                'present_names': stats['present_names'],
+            })
             
-            html_message = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; padding: 20px;">
-                <div style="max-width: 600px; margin: 0 auto; background: #f8f9fa; padding: 30px; border-radius: 15px;">
-                    <h2 style="color: #4361ee; margin-bottom: 20px;">📊 Daily Attendance Report</h2>
-                    <p style="color: #666;">{date.strftime('%A, %d %B %Y')}</p>
-                    
-                    <div style="display: flex; gap: 15px; margin: 20px 0;">
-                        <div style="flex: 1; background: #d4edda; padding: 20px; border-radius: 10px; text-align: center;">
-                            <div style="font-size: 2rem; font-weight: bold; color: #155724;">{present_today}</div>
-                            <div style="color: #155724;">Present</div>
-                        </div>
-                        <div style="flex: 1; background: #f8d7da; padding: 20px; border-radius: 10px; text-align: center;">
-                            <div style="font-size: 2rem; font-weight: bold; color: #721c24;">{absent_today}</div>
-                            <div style="color: #721c24;">Absent</div>
-                        </div>
-                        <div style="flex: 1; background: #cce5ff; padding: 20px; border-radius: 10px; text-align: center;">
-                            <div style="font-size: 2rem; font-weight: bold; color: #004085;">{total_students}</div>
-                            <div style="color: #004085;">Total</div>
-                        </div>
-                    </div>
-                    
-                    <div style="background: white; padding: 20px; border-radius: 10px; margin: 20px 0;">
-                        <h4 style="color: #333; margin-bottom: 15px;">Present Students:</h4>
-                        <div style="color: #666; line-height: 1.8;">
-                            {present_names}
-                        </div>
-                    </div>
-                    
-                    <p style="color: #666; font-size: 12px; margin-top: 30px;">
-                        Smart Attendance System - Automated Report
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
+            EmailNotificationService._send([
+                EmailNotificationService._build_message(subject, plain_message, html_message, [admin_email])
+            ])
             
-            plain_message = strip_tags(html_message)
-            
-            send_mail(
-                subject=subject,
-                message=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[admin_email],
-                html_message=html_message,
-                fail_silently=False
-            )
-            
-            print(f"   📧 Daily report sent to admin")
+            logger.info("📧 Daily report sent to admin")
             return True
             
         except Exception as e:
@@ -362,6 +357,17 @@ class EmailNotificationService:
 # TELEGRAM NOTIFICATIONS
 # ═══════════════════════════════════════════════════════════════════
 
+# Keep-alive HTTPS pool to api.telegram.org: the TLS handshake is paid once,
+# not per notification (retries are handled by _request_with_retry)
+_TELEGRAM_SESSION = requests.Session()
+_TELEGRAM_SESSION.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=10))
+
+# Preferred when available: alerts fired from the dispatch pool and the door
+# loop at the same time share one HTTP/2 connection as parallel streams
+_TELEGRAM_CLIENT = httpx.Client(http2=True) if HTTPX_AVAILABLE else None
+_TELEGRAM_ERRORS = (requests.exceptions.RequestException,) + ((httpx.HTTPError,) if HTTPX_AVAILABLE else ())
+
+
 class TelegramNotificationService:
     """Handle all Telegram notifications"""
 
@@ -370,12 +376,13 @@ class TelegramNotificationService:
     @staticmethod
     def is_enabled():
         """Check if Telegram notifications are enabled"""
-        return bool(
-            getattr(settings, 'TELEGRAM_NOTIFICATIONS', False) and
-            getattr(settings, 'NOTIFICATIONS_ENABLED', False) and
-            getattr(settings, 'TELEGRAM_BOT_TOKEN', None) and
-            getattr(settings, 'TELEGRAM_CHAT_ID', None)
-        )
+        return _conf.telegram_enabled
+
+    @staticmethod
+    def _can_send():
+        """Cheap guard for the message builders: skip formatting and queries
+        when Telegram is off or cooling down (send_message re-checks and logs)"""
+        return TelegramNotificationService.is_enabled() and not TelegramNotificationService._is_in_cooldown()
 
     @staticmethod
     def _is_in_cooldown():
@@ -385,26 +392,43 @@ class TelegramNotificationService:
 
     @staticmethod
     def _start_cooldown(reason):
-        cooldown_seconds = int(getattr(settings, 'TELEGRAM_FAIL_COOLDOWN_SECONDS', 300))
+        cooldown_seconds = _conf.telegram_cooldown_seconds
         TelegramNotificationService._disabled_until = timezone.now() + timedelta(seconds=cooldown_seconds)
-        print(
-            "   ⚠️ Telegram temporarily disabled for "
-            f"{cooldown_seconds}s due to repeated failures: {reason}"
+        logger.warning(
+            "⚠️ Telegram temporarily disabled for %ss due to repeated failures: %s",
+            cooldown_seconds, reason
         )
 
     @staticmethod
     def _request_with_retry(url, *, data=None, files=None):
-        timeout = int(getattr(settings, 'TELEGRAM_REQUEST_TIMEOUT', 10))
-        attempts = int(getattr(settings, 'TELEGRAM_RETRY_ATTEMPTS', 3))
-        retry_delay = float(getattr(settings, 'TELEGRAM_RETRY_DELAY_SECONDS', 1.0))
+        timeout = _conf.telegram_timeout
+        attempts = _conf.telegram_attempts
+        retry_delay = _conf.telegram_retry_delay
 
         for attempt in range(1, attempts + 1):
             try:
-                return requests.post(url, data=data, files=files, timeout=timeout)
-            except requests.exceptions.RequestException as exc:
+                if files:
+                    # A failed attempt may have consumed the file
+                    for f in files.values():
+                        f.seek(0)
+                if _TELEGRAM_CLIENT is not None:
+                    # httpx streams file uploads from disk itself
+                    return _TELEGRAM_CLIENT.post(url, data=data, files=files, timeout=timeout)
+                if files:
+                    if MULTIPART_STREAMING:
+                        fields = {key: str(value) for key, value in (data or {}).items()}
+                        for name, f in files.items():
+                            filename = os.path.basename(f.name)
+                            fields[name] = (filename, f, mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+                        encoder = MultipartEncoder(fields=fields)
+                        return _TELEGRAM_SESSION.post(
+                            url, data=encoder, headers={'Content-Type': encoder.content_type}, timeout=timeout
+                        )
+                return _TELEGRAM_SESSION.post(url, data=data, files=files, timeout=timeout)
+            except _TELEGRAM_ERRORS as exc:
                 if attempt == attempts:
                     raise exc
-                print(f"   ⚠️ Telegram attempt {attempt}/{attempts} failed: {exc}")
+                logger.warning("⚠️ Telegram attempt %d/%d failed: %s", attempt, attempts, exc)
                 time.sleep(retry_delay)
     
     @staticmethod
@@ -414,14 +438,12 @@ class TelegramNotificationService:
             return False
 
         if TelegramNotificationService._is_in_cooldown():
-            print("   ⚠️ Telegram skipped (cooldown active)")
+            logger.warning("⚠️ Telegram skipped (cooldown active)")
             return False
         
         try:
-            token = settings.TELEGRAM_BOT_TOKEN
-            chat_id = settings.TELEGRAM_CHAT_ID
-            
-            url = f"https://api.telegram.org/bot{token}/sendMessage"
+            chat_id = _conf.telegram_chat_id
+            url = _conf.telegram_message_url
             
             data = {
                 'chat_id': chat_id,
@@ -433,15 +455,15 @@ class TelegramNotificationService:
             
             if response.status_code == 200:
                 TelegramNotificationService._disabled_until = None
-                print(f"   📱 Telegram message sent")
+                logger.info("📱 Telegram message sent")
                 return True
             else:
-                print(f"   ❌ Telegram failed: {response.text}")
+                logger.error("❌ Telegram failed: %s", response.text)
                 TelegramNotificationService._start_cooldown(response.text)
                 return False
                 
         except Exception as e:
-            print(f"   ❌ Telegram error: {e}")
+            logger.error("❌ Telegram error: %s", e)
             TelegramNotificationService._start_cooldown(e)
             return False
     
@@ -452,17 +474,15 @@ class TelegramNotificationService:
             return False
 
         if TelegramNotificationService._is_in_cooldown():
-            print("   ⚠️ Telegram photo skipped (cooldown active)")
+            logger.warning("⚠️ Telegram photo skipped (cooldown active)")
             return False
         
         if not os.path.exists(photo_path):
             return False
         
         try:
-            token = settings.TELEGRAM_BOT_TOKEN
-            chat_id = settings.TELEGRAM_CHAT_ID
-            
-            url = f"https://api.telegram.org/bot{token}/sendPhoto"
+            chat_id = _conf.telegram_chat_id
+            url = _conf.telegram_photo_url
             
             with open(photo_path, 'rb') as photo:
                 data = {
@@ -476,21 +496,24 @@ class TelegramNotificationService:
             
             if response.status_code == 200:
                 TelegramNotificationService._disabled_until = None
-                print(f"   📱 Telegram photo sent")
+                logger.info("📱 Telegram photo sent")
                 return True
             else:
-                print(f"   ❌ Telegram photo failed: {response.text}")
+                logger.error("❌ Telegram photo failed: %s", response.text)
                 TelegramNotificationService._start_cooldown(response.text)
                 return False
                 
         except Exception as e:
-            print(f"   ❌ Telegram photo error: {e}")
+            logger.error("❌ Telegram photo error: %s", e)
             TelegramNotificationService._start_cooldown(e)
             return False
     
     @staticmethod
     def send_attendance_notification(student, timestamp=None):
         """Send Telegram notification when attendance is marked"""
+        if not TelegramNotificationService._can_send():
+            return False
+        
         timestamp = timestamp or timezone.now()
         
         message = f"""
@@ -503,12 +526,32 @@ class TelegramNotificationService:
 📍 <b>Location:</b> Main Entrance
 
 #attendance #present
+"""
+        return TelegramNotificationService.send_message(message)
+    
+    @staticmethod
+    def send_registration_notification(student):
+        """Send Telegram notification for a new registration"""
+        if not TelegramNotificationService._can_send():
+            return False
+        
+        message = f"""
+🎉 <b>New Student Registered</b>
+
+👤 <b>Name:</b> {student.name}
+🆔 <b>Roll:</b> {student.roll_number}
+🏢 <b>Dept:</b> {student.department or 'N/A'}
+
+#registration #new
 """
         return TelegramNotificationService.send_message(message)
     
     @staticmethod
     def send_unknown_person_alert(photo_path=None):
         """Send alert about unknown person with photo"""
+        if not TelegramNotificationService._can_send():
+            return False
+        
         timestamp = timezone.now()
         
         message = f"""
@@ -531,24 +574,23 @@ Please check immediately.
             return TelegramNotificationService.send_message(message)
     
     @staticmethod
-    def send_daily_summary(date=None):
-        """Send daily attendance summary"""
+    def send_daily_summary(date=None, stats=None):
+        """Send daily attendance summary (stats from compute_daily_stats)"""
+        if not TelegramNotificationService._can_send():
+            return False
+        
         try:
-            from attendance.models import Student, Attendance
-            
-            today = date or timezone.now().date()
-            if isinstance(today, str):
-                from django.utils.dateparse import parse_date
+            if stats is None:
+                if isinstance(date, str):
+                    from django.utils.dateparse import parse_date
 
-                parsed_date = parse_date(today)
-                today = parsed_date or timezone.now().date()
+                    date = parse_date(date)
+                stats = compute_daily_stats(date, with_names=False)
             
-            total = Student.objects.filter(is_active=True).count()
-            present = Attendance.objects.filter(
-                timestamp__date=today,
-                entry_type='success'
-            ).values('student').distinct().count()
-            absent = total - present
+            today = stats['date']
+            total = stats['total']
+            present = stats['present']
+            absent = stats['absent']
             
             percentage = (present / total * 100) if total > 0 else 0
             
@@ -567,7 +609,7 @@ Please check immediately.
             return TelegramNotificationService.send_message(message)
             
         except Exception as e:
-            print(f"   ❌ Daily summary error: {e}")
+            logger.error("❌ Daily summary error: %s", e)
             return False
 
 
@@ -575,20 +617,66 @@ Please check immediately.
 # UNIFIED NOTIFICATION SERVICE
 # ═══════════════════════════════════════════════════════════════════
 
+# Email and Telegram are independent network calls, so they run side by side
+_NOTIFY_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix='notify')
+
+
+def _run_pooled(func, *args):
+    """
+    Run one channel send on a pool thread
+    
+    Senders touch the ORM (student.department, report stats) outside the
+    request cycle, where Django never recycles connections; expire this
+    thread's connection per CONN_MAX_AGE before and after each send.
+    """
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
+
+
+# Bulk sends are queued this many per Celery message
+NOTIFY_CHUNK_SIZE = 100
+
+
 class NotificationService:
     """Unified notification service - sends to all enabled channels"""
 
+    @staticmethod
+    def dispatch(email_call, telegram_call):
+        """
+        Run the enabled channels concurrently and collect their results
+
+        Each call is a (function, *args) tuple; latency is the slower channel
+        instead of the sum of both.
+        """
+        futures = {}
+        if _conf.email_enabled:
+            futures['email'] = _NOTIFY_POOL.submit(_run_pooled, *email_call)
+        if _conf.telegram_enabled:
+            futures['telegram'] = _NOTIFY_POOL.submit(_run_pooled, *telegram_call)
+        
+        results = {
+            'email': False,
+            'telegram': False
+        }
+        for channel, future in futures.items():
+            results[channel] = future.result()
+        return results
+
     @staticmethod
     def _use_celery():
-        return getattr(settings, 'CELERY_NOTIFICATIONS_ENABLED', False)
+        return _conf.use_celery
 
     @staticmethod
     def _queue_task(task, *args):
         try:
-            task.delay(*args)
+            # Fail fast when the broker is down; callers then send inline
+            task.apply_async(args, retry=False)
             return True
         except Exception as e:
-            print(f"   ⚠️ Celery queue failed: {e}")
+            logger.warning("⚠️ Celery queue failed: %s", e)
             return False
     
     @staticmethod
@@ -598,22 +686,53 @@ class NotificationService:
             'email': False,
             'telegram': False
         }
+        if not (_conf.email_enabled or _conf.telegram_enabled):
+            return results
 
-        if NotificationService._use_celery() and (EmailNotificationService.is_enabled() or TelegramNotificationService.is_enabled()):
+        if NotificationService._use_celery():
             if NotificationService._queue_task(send_attendance_notification_task, student.id, (timestamp or timezone.now()).isoformat()):
                 results['email'] = True
                 results['telegram'] = True
                 return results
         
-        # Email
-        if EmailNotificationService.is_enabled():
-            results['email'] = EmailNotificationService.send_attendance_notification(student, timestamp)
-        
-        # Telegram
-        if TelegramNotificationService.is_enabled():
-            results['telegram'] = TelegramNotificationService.send_attendance_notification(student, timestamp)
-        
-        return results
+        return NotificationService.dispatch(
+            (EmailNotificationService.send_attendance_notification, student, timestamp),
+            (TelegramNotificationService.send_attendance_notification, student, timestamp),
+        )
+    
+    @staticmethod
+    def notify_attendance_many(entries, chunk_size=NOTIFY_CHUNK_SIZE):
+        """
+        Notify about many attendance entries at once
+
+        Args:
+            entries: Iterable of (student, timestamp) pairs
+            chunk_size: Entries per Celery message
+
+        With Celery the entries go out as chunked tasks (one broker message
+        per chunk instead of one per entry); otherwise they are sent inline.
+
+        Returns:
+            Number of entries queued or sent
+        """
+        entries = list(entries)
+        if not entries or not (_conf.email_enabled or _conf.telegram_enabled):
+            return 0
+
+        if NotificationService._use_celery():
+            args = [(student.id, (timestamp or timezone.now()).isoformat()) for student, timestamp in entries]
+            try:
+                send_attendance_notification_task.chunks(args, chunk_size).apply_async(retry=False)
+                return len(entries)
+            except Exception as e:
+                logger.warning("⚠️ Celery queue failed: %s", e)
+
+        for student, timestamp in entries:
+            NotificationService.dispatch(
+                (EmailNotificationService.send_attendance_notification, student, timestamp),
+                (TelegramNotificationService.send_attendance_notification, student, timestamp),
+            )
+        return len(entries)
     
     @staticmethod
     def notify_unknown_person(photo_path=None):
@@ -622,22 +741,19 @@ class NotificationService:
             'email': False,
             'telegram': False
         }
+        if not (_conf.email_enabled or _conf.telegram_enabled):
+            return results
 
-        if NotificationService._use_celery() and (EmailNotificationService.is_enabled() or TelegramNotificationService.is_enabled()):
+        if NotificationService._use_celery():
             if NotificationService._queue_task(send_unknown_person_alert_task, photo_path):
                 results['email'] = True
                 results['telegram'] = True
                 return results
         
-        # Email
-        if EmailNotificationService.is_enabled():
-            results['email'] = EmailNotificationService.send_unknown_person_alert(photo_path)
-        
-        # Telegram
-        if TelegramNotificationService.is_enabled():
-            results['telegram'] = TelegramNotificationService.send_unknown_person_alert(photo_path)
-        
-        return results
+        return NotificationService.dispatch(
+            (EmailNotificationService.send_unknown_person_alert, photo_path),
+            (TelegramNotificationService.send_unknown_person_alert, photo_path),
+        )
     
     @staticmethod
     def notify_registration(student, username, password):
@@ -646,31 +762,19 @@ class NotificationService:
             'email': False,
             'telegram': False
         }
+        if not (_conf.email_enabled or _conf.telegram_enabled):
+            return results
 
-        if NotificationService._use_celery() and (EmailNotificationService.is_enabled() or TelegramNotificationService.is_enabled()):
+        if NotificationService._use_celery():
             if NotificationService._queue_task(send_registration_notification_task, student.id, username, password):
                 results['email'] = True
                 results['telegram'] = True
                 return results
         
-        # Email welcome
-        if EmailNotificationService.is_enabled():
-            results['email'] = EmailNotificationService.send_welcome_email(student, username, password)
-        
-        # Telegram notification
-        if TelegramNotificationService.is_enabled():
-            message = f"""
-🎉 <b>New Student Registered</b>
-
-👤 <b>Name:</b> {student.name}
-🆔 <b>Roll:</b> {student.roll_number}
-🏢 <b>Dept:</b> {student.department or 'N/A'}
-
-#registration #new
-"""
-            results['telegram'] = TelegramNotificationService.send_message(message)
-        
-        return results
+        return NotificationService.dispatch(
+            (EmailNotificationService.send_welcome_email, student, username, password),
+            (TelegramNotificationService.send_registration_notification, student),
+        )
     
     @staticmethod
     def send_daily_report():
@@ -679,17 +783,18 @@ class NotificationService:
             'email': False,
             'telegram': False
         }
+        if not (_conf.email_enabled or _conf.telegram_enabled):
+            return results
 
-        if NotificationService._use_celery() and (EmailNotificationService.is_enabled() or TelegramNotificationService.is_enabled()):
+        if NotificationService._use_celery():
             if NotificationService._queue_task(send_daily_report_task, timezone.now().date().isoformat()):
                 results['email'] = True
                 results['telegram'] = True
                 return results
         
-        if EmailNotificationService.is_enabled():
-            results['email'] = EmailNotificationService.send_daily_report()
-        
-        if TelegramNotificationService.is_enabled():
-            results['telegram'] = TelegramNotificationService.send_daily_summary()
-        
-        return results
\ No newline at end of file
+        # Query once; both channels report the same numbers (names only for the email)
+        stats = compute_daily_stats(with_names=EmailNotificationService.is_enabled())
+        return NotificationService.dispatch(
+            (EmailNotificationService.send_daily_report, None, stats),
+            (TelegramNotificationService.send_daily_summary, None, stats),
+        )
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""Model signal handlers for the attendance app."""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from attendance.caching import bump_model_version
+from attendance.models import Attendance, Department, Student, SystemLog
+
+
+@receiver(post_save, sender=Student, dispatch_uid='attendance.student_saved_refresh_faces')
+@receiver(post_delete, sender=Student, dispatch_uid='attendance.student_deleted_refresh_faces')
+def refresh_face_gallery(sender, instance, created=False, **kwargs):
+    """Update the in-memory face gallery whenever a Student changes.
+
+    A new registration is appended to the index in place; edits and
+    deletions rebuild it on a background thread once the transaction
+    commits, so the request responds immediately either way.
+    """
+    from attendance.services.face_recognition_service import (
+        add_face_to_service_if_loaded,
+        refresh_face_service_in_background,
+    )
+
+    if created:
+        transaction.on_commit(lambda: add_face_to_service_if_loaded(instance))
+    else:
+        transaction.on_commit(refresh_face_service_in_background)
+
+
+@receiver(post_save, sender=Student, dispatch_uid='attendance.student_saved_sync_attendance')
+def sync_attendance_student_fields(sender, instance, created, **kwargs):
+    """Carry a renamed student's name and roll number onto their attendance rows."""
+    if created:
+        return
+    Attendance.objects.filter(student=instance).exclude(
+        student_name=instance.name, student_roll_number=instance.roll_number
+    ).update(student_name=instance.name, student_roll_number=instance.roll_number)
+
+
+@receiver(post_save, sender=Student, dispatch_uid='attendance.student_saved_bump_version')
+@receiver(post_delete, sender=Student, dispatch_uid='attendance.student_deleted_bump_version')
+@receiver(post_save, sender=Attendance, dispatch_uid='attendance.attendance_saved_bump_version')
+@receiver(post_delete, sender=Attendance, dispatch_uid='attendance.attendance_deleted_bump_version')
+@receiver(post_save, sender=SystemLog, dispatch_uid='attendance.systemlog_saved_bump_version')
+@receiver(post_delete, sender=SystemLog, dispatch_uid='attendance.systemlog_deleted_bump_version')
+@receiver(post_save, sender=Department, dispatch_uid='attendance.department_saved_bump_version')
+@receiver(post_delete, sender=Department, dispatch_uid='attendance.department_deleted_bump_version')
+def bump_cached_versions(sender, **kwargs):
+    """Invalidate cached changelists and lookups for the changed model."""
+    bump_model_version(sender)
+    if sender is Student:
+        # Attendance rows display the student's name
+        bump_model_version(Attendance)
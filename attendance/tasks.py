@@ -29,6 +29,7 @@ def send_attendance_notification_task(student_id, timestamp_iso=None):
     from attendance.models import Student
     from attendance.services.notification_service import (
         EmailNotificationService,
+        NotificationService,
         TelegramNotificationService,
     )
 
@@ -37,23 +38,24 @@ def send_attendance_notification_task(student_id, timestamp_iso=None):
         return {'email': False, 'telegram': False}
 
     timestamp = _load_timestamp(timestamp_iso)
-    return {
-        'email': EmailNotificationService.send_attendance_notification(student, timestamp),
-        'telegram': TelegramNotificationService.send_attendance_notification(student, timestamp),
-    }
+    return NotificationService.dispatch(
+        (EmailNotificationService.send_attendance_notification, student, timestamp),
+        (TelegramNotificationService.send_attendance_notification, student, timestamp),
+    )
 
 
 @shared_task(name='attendance.send_unknown_person_alert')
 def send_unknown_person_alert_task(photo_path=None):
     from attendance.services.notification_service import (
         EmailNotificationService,
+        NotificationService,
         TelegramNotificationService,
     )
 
-    return {
-        'email': EmailNotificationService.send_unknown_person_alert(photo_path),
-        'telegram': TelegramNotificationService.send_unknown_person_alert(photo_path),
-    }
+    return NotificationService.dispatch(
+        (EmailNotificationService.send_unknown_person_alert, photo_path),
+        (TelegramNotificationService.send_unknown_person_alert, photo_path),
+    )
 
 
 @shared_task(name='attendance.send_registration_notification')
@@ -61,6 +63,7 @@ def send_registration_notification_task(student_id, username, password):
     from attendance.models import Student
     from attendance.services.notification_service import (
         EmailNotificationService,
+        NotificationService,
         TelegramNotificationService,
     )
 
@@ -68,59 +71,43 @@ def send_registration_notification_task(student_id, username, password):
     if not student:
         return {'email': False, 'telegram': False}
 
-    return {
-        'email': EmailNotificationService.send_welcome_email(student, username, password),
-        'telegram': TelegramNotificationService.send_message(
-            f"""
-🎉 <b>New Student Registered</b>
-
-👤 <b>Name:</b> {student.name}
-🆔 <b>Roll:</b> {student.roll_number}
-🏢 <b>Dept:</b> {student.department or 'N/A'}
-
-#registration #new
-"""
-        ),
-    }
+    return NotificationService.dispatch(
+        (EmailNotificationService.send_welcome_email, student, username, password),
+        (TelegramNotificationService.send_registration_notification, student),
+    )
 
 
 @shared_task(name='attendance.send_daily_report')
 def send_daily_report_task(date_iso=None):
-    from attendance.models import Attendance, Student
     from attendance.services.notification_service import (
         EmailNotificationService,
+        NotificationService,
         TelegramNotificationService,
+        compute_daily_stats,
     )
 
     report_date = parse_date(date_iso) if date_iso else timezone.now().date()
     if report_date is None:
         report_date = timezone.now().date()
 
-    total_students = Student.objects.filter(is_active=True).count()
-    present_today = Attendance.objects.filter(
-        timestamp__date=report_date,
-        entry_type='success'
-    ).values('student').distinct().count()
-    absent_today = total_students - present_today
+    # One set of queries shared by both channels and the task result
+    stats = compute_daily_stats(report_date)
 
-    present_list = Attendance.objects.filter(
-        timestamp__date=report_date,
-        entry_type='success'
-    ).select_related('student').values_list('student__name', flat=True).distinct()
-
-    present_names = '<br>'.join([f'✅ {name}' for name in present_list])
+    present_names = '<br>'.join([f'✅ {name}' for name in stats['present_names']])
     if not present_names:
         present_names = 'No attendance recorded'
 
-    email_result = EmailNotificationService.send_daily_report(report_date)
-    telegram_result = TelegramNotificationService.send_daily_summary(report_date)
+    results = NotificationService.dispatch(
+        (EmailNotificationService.send_daily_report, report_date, stats),
+        (TelegramNotificationService.send_daily_summary, report_date, stats),
+    )
 
     return {
-        'email': email_result,
-        'telegram': telegram_result,
+        'email': results['email'],
+        'telegram': results['telegram'],
         'date': report_date.isoformat(),
-        'present': present_today,
-        'absent': absent_today,
-        'total': total_students,
+        'present': stats['present'],
+        'absent': stats['absent'],
+        'total': stats['total'],
         'students': present_names,
     }
\ No newline at end of file
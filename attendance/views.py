@@ -6,6 +6,7 @@ Handles web pages and API endpoints with User Authentication
 
 import json
 import base64
+import hashlib
 import cv2
 import numpy as np
 import os
@@ -15,15 +16,19 @@ from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.models import User
 from django.core.paginator import Paginator
-from django.db.models import Count, Q
+from django.db import connection
+from django.db.models import Count, Max, Q
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 
+from .caching import versioned_get_or_set
 from .models import Student, Attendance, SystemLog, Department, NotificationState
 from .services.face_recognition_service import (
     get_face_recognition_service,
@@ -38,6 +43,23 @@ try:
 except:
     NOTIFICATIONS_AVAILABLE = False
 
+# Optional: libjpeg-turbo decoder for webcam JPEGs (needs the native library too)
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    _turbo_jpeg = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except Exception:
+    TURBOJPEG_AVAILABLE = False
+
+# Optional: SIMD base64 decoder for posted images
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+
+JPEG_MAGIC = b'\xff\xd8\xff'
+
 
 # ═══════════════════════════════════════════════════════════════════
 # HELPER FUNCTIONS
@@ -87,6 +109,53 @@ def _can_access_notification(user, notification_type, object_id):
     return False
 
 
+def _day_start(day):
+    """Local midnight at the start of a date, as an aware datetime"""
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def _on_day(day):
+    """
+    Half-open timestamp range for one local day
+    
+    Same rows as timestamp__date=day, but a plain range the timestamp
+    indexes can serve instead of a per-row date cast.
+    """
+    return Q(timestamp__gte=_day_start(day), timestamp__lt=_day_start(day + timedelta(days=1)))
+
+
+def _decode_data_url(data):
+    """Bytes of a base64 payload, with or without a data: URL prefix"""
+    _, _, payload = data.partition('base64,')
+    payload = payload or data
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64decode(payload, validate=False)
+    return base64.b64decode(payload)
+
+
+def _decode_image(image_bytes):
+    """Decode uploaded image bytes to a BGR array, or None if unreadable"""
+    if TURBOJPEG_AVAILABLE and image_bytes[:3] == JPEG_MAGIC:
+        try:
+            return _turbo_jpeg.decode(image_bytes, pixel_format=TJPF_BGR)
+        except Exception:
+            pass  # Truncated or unusual JPEG: let OpenCV have a go
+    # PNG/WebP from browsers that do not post JPEG
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+
+
+def _active_department_names():
+    """Active department names for dropdowns, cached until a Department changes"""
+    return versioned_get_or_set(
+        Department,
+        'active_department_names',
+        lambda: list(
+            Department.objects.filter(is_active=True).exclude(name='')
+            .order_by('name').values_list('name', flat=True).iterator()
+        ),
+    )
+
+
 def _parse_notification_key(raw_key):
     """Parse `alert-123` / `entry-456` style key."""
     if not isinstance(raw_key, str) or '-' not in raw_key:
@@ -201,7 +270,7 @@ def user_profile(request):
         # This month's attendance
         first_of_month = today.replace(day=1)
         attendance_stats['month_attendance'] = all_attendance.filter(
-            timestamp__date__gte=first_of_month
+            timestamp__gte=_day_start(first_of_month)
         ).values('timestamp__date').distinct().count()
         
         # Last access
@@ -355,38 +424,74 @@ def dashboard(request):
         return user_dashboard(request)
 
 
+# Bounds staleness for Student changes made by another process
+DASHBOARD_CACHE_SECONDS = 30
+
+
+def _today_marker(today):
+    """
+    (newest timestamp, row count) of today's attendance
+    
+    One indexed range query that changes whenever any process (the door
+    system included) inserts or deletes a row today; the per-process
+    version counter cannot see those writes.
+    """
+    marker = Attendance.objects.filter(_on_day(today)).aggregate(
+        latest=Max('timestamp'), rows=Count('id'),
+    )
+    return marker['latest'], marker['rows']
+
+
+def _dashboard_counts(today, marker=None):
+    """
+    Today's headline numbers: (total_students, present_today, failed_attempts)
+    
+    Keyed on today's attendance marker, so a door entry from any process
+    is reflected on the next load; the Attendance version (which Student
+    saves bump) covers admin edits made in this process.
+    """
+    latest, rows = marker or _today_marker(today)
+    return versioned_get_or_set(
+        Attendance, f'dashboard_counts:{today}:{latest}:{rows}',
+        lambda: _compute_dashboard_counts(today),
+        DASHBOARD_CACHE_SECONDS,
+    )
+
+
+def _compute_dashboard_counts(today):
+    """Two aggregate queries instead of one COUNT per figure"""
+    today_counts = Attendance.objects.filter(_on_day(today)).aggregate(
+        present=Count('student', filter=Q(entry_type='success'), distinct=True),
+        failed=Count('id', filter=Q(entry_type='denied')),
+    )
+    total_students = Student.objects.aggregate(total=Count('id', filter=Q(is_active=True)))['total']
+    return total_students, today_counts['present'], today_counts['failed']
+
+
 def admin_dashboard(request):
     """
     Admin Dashboard - Full access to all data
     """
     today = timezone.now().date()
     
-    # Get today's attendance
-    today_attendance = Attendance.objects.filter(
-        timestamp__date=today,
-        entry_type='success'
-    ).select_related('student').order_by('-timestamp')
-    
     # Get statistics
-    total_students = Student.objects.filter(is_active=True).count()
-    present_today = today_attendance.values('student').distinct().count()
+    total_students, present_today, failed_attempts = _dashboard_counts(today)
     absent_today = total_students - present_today
     
-    # Get failed attempts
-    failed_attempts = Attendance.objects.filter(
-        timestamp__date=today,
-        entry_type='denied'
-    ).count()
-    
     # Get recent entries
-    recent_entries = today_attendance[:10]
+    recent_entries = list(
+        Attendance.objects.filter(
+            _on_day(today),
+            entry_type='success'
+        ).select_related('student').order_by('-timestamp')[:10]
+    )
     
     # Weekly stats for chart
     week_stats = []
     for i in range(6, -1, -1):
         day = today - timedelta(days=i)
         count = Attendance.objects.filter(
-            timestamp__date=day,
+            _on_day(day),
             entry_type='success'
         ).values('student').distinct().count()
         week_stats.append({
@@ -435,28 +540,30 @@ def user_dashboard(request):
     )
     
     # Today's status
-    is_present_today = all_attendance.filter(timestamp__date=today).exists()
+    is_present_today = all_attendance.filter(_on_day(today)).exists()
     
     # Get last access
     last_access = all_attendance.first()  # Already ordered by -timestamp
     
-    # This month's attendance
+    # This month's and all-time attendance days in one scan
     first_of_month = today.replace(day=1)
-    month_attendance = all_attendance.filter(
-        timestamp__date__gte=first_of_month
-    ).values('timestamp__date').distinct().count()
-    
-    # Total attendance days
-    total_days = all_attendance.values('timestamp__date').distinct().count()
+    day_counts = all_attendance.aggregate(
+        month_days=Count(TruncDate('timestamp'), filter=Q(timestamp__gte=_day_start(first_of_month)), distinct=True),
+        total_days=Count(TruncDate('timestamp'), distinct=True),
+    )
+    month_attendance = day_counts['month_days']
+    total_days = day_counts['total_days']
     
     # Recent attendance records
-    recent_records = Attendance.objects.filter(student=student).order_by('-timestamp')[:20]
+    recent_records = Attendance.objects.filter(student=student).only(
+        'timestamp', 'entry_type', 'location', 'student_id'
+    ).order_by('-timestamp')[:20]
     
     # Weekly attendance for chart
     week_attendance = []
     for i in range(6, -1, -1):
         day = today - timedelta(days=i)
-        present = all_attendance.filter(timestamp__date=day).exists()
+        present = all_attendance.filter(_on_day(day)).exists()
         week_attendance.append({
             'day': day.strftime('%a'),
             'date': day.strftime('%Y-%m-%d'),
@@ -492,12 +599,11 @@ def register_student(request):
     if request.method == 'POST':
         return handle_student_registration(request)
     
-    # Fetch active departments from database
-    departments = Department.objects.filter(is_active=True).values_list('name', flat=True).order_by('name')
+    departments = _active_department_names()
     
     context = {
         'camera_index': CAMERA_INDEX,
-        'departments': list(departments),
+        'departments': departments,
         'user_types': [
             ('student', 'Student'),
             ('staff', 'Staff'),
@@ -553,12 +659,8 @@ def handle_student_registration(request):
         
         if profile_photo_data:
             try:
-                # Remove data URL prefix
-                if 'base64,' in profile_photo_data:
-                    profile_photo_data = profile_photo_data.split('base64,')[1]
-                
-                # Decode base64
-                image_data = base64.b64decode(profile_photo_data)
+                # Decode base64 (data URL prefix optional)
+                image_data = _decode_data_url(profile_photo_data)
                 
                 # Create filename
                 filename = f"{roll_number.replace(' ', '_').replace('-', '_')}_{uuid.uuid4().hex[:8]}.jpg"
@@ -643,10 +745,6 @@ def handle_student_registration(request):
             except Exception as e:
                 print(f"Notification error: {e}")
         
-        # Refresh face recognition cache
-        service = get_face_recognition_service()
-        service.refresh_cache()
-        
         # Log registration
         SystemLog.objects.create(
             log_type='success',
@@ -756,14 +854,8 @@ def capture_face_api(request):
                 'error': 'No image data received'
             })
         
-        # Remove data URL prefix if present
-        if 'base64,' in image_data:
-            image_data = image_data.split('base64,')[1]
-        
-        # Decode base64 image
-        image_bytes = base64.b64decode(image_data)
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        # Decode base64 image (data URL prefix optional)
+        image = _decode_image(_decode_data_url(image_data))
         
         if image is None:
             return JsonResponse({
@@ -872,14 +964,30 @@ def student_list(request):
     user_type = request.GET.get('user_type', '')
     status = request.GET.get('status', '')
     
-    students = Student.objects.all().order_by('registered_at')
+    # The list never shows encodings; the department name is rendered per row
+    students = Student.objects.select_related('department').defer(
+        'face_encoding', 'face_encoding_bin'
+    ).order_by('registered_at')
     
     if search:
+        # ILIKE '%q%' on each column is served by the pg_trgm GIN indexes on PostgreSQL
         students = students.filter(
             Q(name__icontains=search) |
             Q(roll_number__icontains=search) |
             Q(email__icontains=search)
         )
+        if connection.vendor == 'postgresql':
+            from django.contrib.postgres.search import TrigramSimilarity
+            from django.db.models.functions import Coalesce, Greatest
+            
+            # Closest matches first
+            students = students.annotate(
+                similarity=Greatest(
+                    TrigramSimilarity('name', search),
+                    TrigramSimilarity('roll_number', search),
+                    Coalesce(TrigramSimilarity('email', search), 0.0),
+                )
+            ).order_by('-similarity', 'registered_at')
     
     if department:
         students = students.filter(department__name__iexact=department)
@@ -897,14 +1005,13 @@ def student_list(request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # Get unique active departments from database
-    departments = Department.objects.filter(is_active=True).values_list('name', flat=True).order_by('name')
+    departments = _active_department_names()
     
     context = {
         'page_obj': page_obj,
         'students': page_obj,
-        'total_students': students.count(),
-        'departments': list(departments),
+        'total_students': paginator.count,
+        'departments': departments,
         'search': search,
         'selected_department': department,
         'selected_user_type': user_type,
@@ -919,7 +1026,9 @@ def student_detail(request, pk):
     """
     View student details - Admin sees any student, User sees only self
     """
-    student = get_object_or_404(Student, pk=pk)
+    student = get_object_or_404(
+        Student.objects.select_related('department').defer('face_encoding', 'face_encoding_bin'), pk=pk
+    )
     
     # Check permission: Admin can see all, User can see only their own
     if not is_admin(request.user):
@@ -928,23 +1037,22 @@ def student_detail(request, pk):
             messages.error(request, 'You do not have permission to view this profile.')
             return redirect('dashboard')
     
-    all_attendance = Attendance.objects.filter(
-        student=student,
-        entry_type='success'
-    )
-    
-    total_days = all_attendance.values('timestamp__date').distinct().count()
-    
+    # All-time and 30-day attendance days in one scan
     thirty_days_ago = timezone.now() - timedelta(days=30)
-    recent_attendance = Attendance.objects.filter(
+    day_counts = Attendance.objects.filter(
         student=student,
-        timestamp__gte=thirty_days_ago,
         entry_type='success'
-    ).values('timestamp__date').distinct().count()
+    ).aggregate(
+        total_days=Count(TruncDate('timestamp'), distinct=True),
+        recent_days=Count(TruncDate('timestamp'), filter=Q(timestamp__gte=thirty_days_ago), distinct=True),
+    )
+    total_days = day_counts['total_days']
+    recent_attendance = day_counts['recent_days']
     
+    # The history table only shows these columns; the student is already known
     attendance_records = Attendance.objects.filter(
         student=student
-    ).order_by('-timestamp')[:50]
+    ).only('timestamp', 'entry_type', 'location', 'student_id').order_by('-timestamp')[:50]
     
     context = {
         'student': student,
@@ -978,9 +1086,6 @@ def delete_student(request, pk):
         
         student.delete()
         
-        service = get_face_recognition_service()
-        service.refresh_cache()
-        
         SystemLog.objects.create(
             log_type='warning',
             message=f"Student deleted: {name}"
@@ -1007,9 +1112,6 @@ def toggle_student_status(request, pk):
         student.user.is_active = student.is_active
         student.user.save()
     
-    service = get_face_recognition_service()
-    service.refresh_cache()
-    
     status = "activated" if student.is_active else "deactivated"
     messages.success(request, f"Student '{student.name}' has been {status}.")
     
@@ -1038,7 +1140,7 @@ def attendance_list(request):
     else:
         student = get_student_for_user(request.user)
         if student:
-            records = Attendance.objects.filter(student=student).order_by('-timestamp')
+            records = Attendance.objects.filter(student=student).select_related('student').order_by('-timestamp')
         else:
             records = Attendance.objects.none()
     
@@ -1046,14 +1148,14 @@ def attendance_list(request):
     if date_from:
         try:
             date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
-            records = records.filter(timestamp__date__gte=date_from_obj)
+            records = records.filter(timestamp__gte=_day_start(date_from_obj))
         except:
             pass
     
     if date_to:
         try:
             date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
-            records = records.filter(timestamp__date__lte=date_to_obj)
+            records = records.filter(timestamp__lt=_day_start(date_to_obj + timedelta(days=1)))
         except:
             pass
     
@@ -1067,12 +1169,15 @@ def attendance_list(request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    students = Student.objects.filter(is_active=True).order_by('name') if is_admin(request.user) else []
+    students = (
+        Student.objects.filter(is_active=True).only('id', 'name', 'roll_number').order_by('name')
+        if is_admin(request.user) else []
+    )
     
     context = {
         'page_obj': page_obj,
         'records': page_obj,
-        'total_records': records.count(),
+        'total_records': paginator.count,
         'students': students,
         'date_from': date_from,
         'date_to': date_to,
@@ -1095,8 +1200,8 @@ def reports(request):
     Reports page - Admin only
     """
     context = {
-        'students': Student.objects.filter(is_active=True).order_by('name'),
-        'departments': Department.objects.filter(is_active=True).order_by('name'),
+        'students': Student.objects.filter(is_active=True).only('id', 'name', 'roll_number').order_by('name'),
+        'departments': Department.objects.filter(is_active=True).only('id', 'name').order_by('name'),
     }
     return render(request, 'attendance/reports.html', context)
 
@@ -1122,14 +1227,14 @@ def generate_report(request):
     if date_from:
         try:
             date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
-            records = records.filter(timestamp__date__gte=date_from_obj)
+            records = records.filter(timestamp__gte=_day_start(date_from_obj))
         except:
             pass
     
     if date_to:
         try:
             date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
-            records = records.filter(timestamp__date__lte=date_to_obj)
+            records = records.filter(timestamp__lt=_day_start(date_to_obj + timedelta(days=1)))
         except:
             pass
     
@@ -1160,7 +1265,6 @@ def generate_report(request):
     records = records.order_by('-timestamp')
 
     success_records = records.filter(entry_type='success')
-    denied_records = records.filter(entry_type='denied')
 
     summary = success_records.values('student__name', 'student__roll_number').annotate(
         total_days=Count('timestamp__date', distinct=True),
@@ -1182,12 +1286,13 @@ def generate_report(request):
     max_daily_entries = max([item['total_entries'] for item in daily_stats_list], default=1)
     max_daily_students = max([item['unique_students'] for item in daily_stats_list], default=1)
 
-    total_records = records.count()
-    total_success = success_records.count()
-    total_denied = denied_records.count()
+    # The per-day breakdown already holds every total, so no recounting
+    total_records = sum(item['total_entries'] for item in daily_stats_list)
+    total_success = sum(item['success_entries'] for item in daily_stats_list)
+    total_denied = sum(item['denied_entries'] for item in daily_stats_list)
     unique_students = records.exclude(student__isnull=True).values('student').distinct().count()
     total_students = student_scope.count()
-    active_days = success_records.values('timestamp__date').distinct().count()
+    active_days = sum(1 for item in daily_stats_list if item['success_entries'])
     avg_per_day = round((total_success / active_days), 1) if active_days > 0 else 0
 
     context = {
@@ -1222,30 +1327,18 @@ def generate_excel_report(records, summary, request):
     """
     try:
         from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
         from openpyxl.styles import Font, PatternFill, Alignment
         
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Attendance Report"
+        # Write-only mode streams rows to the file instead of keeping a Cell per value
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Attendance Report")
         
         header_font = Font(bold=True, color="FFFFFF")
         header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        header_alignment = Alignment(horizontal='center')
         
-        headers = ['Sr.', 'Name', 'Roll Number', 'Date', 'Time', 'Status']
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal='center')
-        
-        for row, record in enumerate(records[:1000], 2):
-            ws.cell(row=row, column=1, value=row-1)
-            ws.cell(row=row, column=2, value=record.student.name if record.student else 'Unknown')
-            ws.cell(row=row, column=3, value=record.student.roll_number if record.student else 'N/A')
-            ws.cell(row=row, column=4, value=record.timestamp.strftime('%Y-%m-%d'))
-            ws.cell(row=row, column=5, value=record.timestamp.strftime('%H:%M:%S'))
-            ws.cell(row=row, column=6, value='Present')
-        
+        # Column widths must be set before the first row is written
         ws.column_dimensions['A'].width = 8
         ws.column_dimensions['B'].width = 25
         ws.column_dimensions['C'].width = 15
@@ -1253,6 +1346,30 @@ def generate_excel_report(records, summary, request):
         ws.column_dimensions['E'].width = 10
         ws.column_dimensions['F'].width = 10
         
+        headers = ['Sr.', 'Name', 'Roll Number', 'Date', 'Time', 'Status']
+        header_row = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+            header_row.append(cell)
+        ws.append(header_row)
+        
+        # Plain tuples from the denormalized columns: no join, no model instances
+        rows = records.select_related(None).values_list(
+            'student_name', 'student_roll_number', 'timestamp'
+        )[:1000].iterator(chunk_size=500)
+        for index, (name, roll_number, timestamp) in enumerate(rows, 1):
+            ws.append([
+                index,
+                name or 'Unknown',
+                roll_number or 'N/A',
+                timestamp.strftime('%Y-%m-%d'),
+                timestamp.strftime('%H:%M:%S'),
+                'Present',
+            ])
+        
         response = HttpResponse(
             content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
@@ -1411,35 +1528,49 @@ def notification_state_api(request):
 
     return JsonResponse({'success': True, 'updated': updated_count})
 
+def _dashboard_stats_snapshot(request):
+    """Counts and marker for this request, computed once for ETag and body"""
+    snapshot = getattr(request, '_dashboard_stats', None)
+    if snapshot is None:
+        today = timezone.now().date()
+        marker = _today_marker(today)
+        snapshot = (today, marker, _dashboard_counts(today, marker))
+        request._dashboard_stats = snapshot
+    return snapshot
+
+
+def _dashboard_stats_etag(request):
+    """
+    Hash of exactly what the response is built from
+    
+    The counts in the tag are the (possibly cached) counts the body will
+    carry and the marker covers the recent-entries list, so a 304 can
+    never pin the browser to numbers the server would no longer send.
+    """
+    today, marker, counts = _dashboard_stats_snapshot(request)
+    return hashlib.md5(f"{today}|{marker}|{counts}".encode()).hexdigest()
+
+
 @csrf_exempt
+@cache_control(private=True, max_age=5)
+@condition(etag_func=_dashboard_stats_etag)
 def api_dashboard_stats(request):
     """
     API endpoint to get dashboard statistics
     """
-    today = timezone.now().date()
-    
-    total_students = Student.objects.filter(is_active=True).count()
-    present_today = Attendance.objects.filter(
-        timestamp__date=today,
-        entry_type='success'
-    ).values('student').distinct().count()
-    
-    failed_attempts = Attendance.objects.filter(
-        timestamp__date=today,
-        entry_type='denied'
-    ).count()
+    today, _, (total_students, present_today, failed_attempts) = _dashboard_stats_snapshot(request)
     
     recent = Attendance.objects.filter(
-        timestamp__date=today,
+        _on_day(today),
         entry_type='success'
-    ).select_related('student').order_by('-timestamp')[:5]
+    ).order_by('-timestamp').values('student_name', 'student_roll_number', 'timestamp')[:5]
     
     recent_list = []
     for entry in recent:
         recent_list.append({
-            'name': entry.student.name if entry.student else 'Unknown',
-            'time': entry.timestamp.strftime('%H:%M:%S'),
-            'roll_number': entry.student.roll_number if entry.student else 'N/A'
+            'name': entry['student_name'] or 'Unknown',
+            'time': entry['timestamp'].strftime('%H:%M:%S'),
+            'roll_number': entry['student_roll_number'] or 'N/A'
         })
     
     return JsonResponse({
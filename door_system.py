@@ -28,8 +28,9 @@ django.setup()
 
 from django.utils import timezone
 from django.conf import settings
-from attendance.models import Student, Attendance, SystemLog
+from attendance.models import Student, Attendance
 from attendance.services.face_recognition_service import FaceRecognitionService
+from attendance.services.log_queue import enqueue_log
 
 # ═══════════════════════════════════════════════════════════════════
 # Serial Import
@@ -112,7 +113,7 @@ def log_system(log_type, message, details=None):
     timestamp = datetime.now().strftime("%H:%M:%S")
     print(f"[{timestamp}] [{log_type.upper()}] {message}")
     try:
-        SystemLog.objects.create(log_type=log_type, message=message, details=details)
+        enqueue_log(log_type, message, details=details)
     except:
         pass
 
@@ -862,22 +863,21 @@ class DoorSystem:
                                 face_color = (0, 0, 255)
                                 face_conf = 0
 
-                                if self.face_service.known_face_encodings:
-                                    distances = face_recognition.face_distance(
-                                        self.face_service.known_face_encodings,
-                                        face_encoding
-                                    )
+                                # One snapshot: a reload must not swap the lists mid-match
+                                gallery = self.face_service.gallery
+                                if len(gallery):
+                                    # Best match + runner-up straight from the gallery index
+                                    distances, indices = gallery.index.search(face_encoding, k=2)
 
                                     if len(distances) > 0:
-                                        best_idx = int(np.argmin(distances))
-                                        best_distance = float(distances[best_idx])
-                                        sorted_distances = np.sort(distances)
-                                        second_best = float(sorted_distances[1]) if len(sorted_distances) > 1 else 1.0
+                                        best_idx = int(indices[0])
+                                        best_distance = float(distances[0])
+                                        second_best = float(distances[1]) if len(distances) > 1 else 1.0
                                         distance_gap = second_best - best_distance
-                                        is_separated = len(sorted_distances) == 1 or distance_gap >= MATCH_SEPARATION_MARGIN
+                                        is_separated = len(distances) == 1 or distance_gap >= MATCH_SEPARATION_MARGIN
 
                                         if best_distance <= RECOGNITION_TOLERANCE and is_separated:
-                                            candidate = self.face_service.known_students[best_idx]
+                                            candidate = gallery.students[best_idx]
                                             candidate_conf = 1 - best_distance
                                             face_name = candidate.name
                                             face_conf = candidate_conf
@@ -1158,7 +1158,11 @@ class DoorSystem:
             # After saving denied image, add:
             if NOTIFICATIONS_AVAILABLE and frame is not None:
                 try:
-                    NotificationService.notify_unknown_person(filepath)
+                    run_in_background(
+                        'denied access alert',
+                        NotificationService.notify_unknown_person,
+                        filepath,
+                    )
                 except:
                     pass
         
@@ -1570,22 +1574,21 @@ def live_camera_attendance():
                             confidence = 0
                             
                             # Compare with known faces
-                            if service.known_face_encodings:
-                                face_distances = face_recognition.face_distance(
-                                    service.known_face_encodings, 
-                                    face_encoding
-                                )
+                            # One snapshot: a reload must not swap the lists mid-match
+                            gallery = service.gallery
+                            if len(gallery):
+                                # Best match + runner-up straight from the gallery index
+                                face_distances, face_indices = gallery.index.search(face_encoding, k=2)
                                 
                                 if len(face_distances) > 0:
-                                    best_match_index = np.argmin(face_distances)
-                                    best_distance = face_distances[best_match_index]
-                                    sorted_distances = np.sort(face_distances)
-                                    second_best_distance = sorted_distances[1] if len(sorted_distances) > 1 else 1.0
+                                    best_match_index = int(face_indices[0])
+                                    best_distance = float(face_distances[0])
+                                    second_best_distance = float(face_distances[1]) if len(face_distances) > 1 else 1.0
                                     distance_gap = float(second_best_distance - best_distance)
-                                    is_separated = len(sorted_distances) == 1 or distance_gap >= MATCH_SEPARATION_MARGIN
+                                    is_separated = len(face_distances) == 1 or distance_gap >= MATCH_SEPARATION_MARGIN
                                     
                                     if best_distance <= RECOGNITION_TOLERANCE and is_separated:
-                                        student = service.known_students[best_match_index]
+                                        student = gallery.students[best_match_index]
                                         confidence = 1 - best_distance
                                         name = student.name
                                         
@@ -1652,7 +1655,9 @@ def live_camera_attendance():
 
                             if status == 'unknown':
                                 unknown_detected_this_cycle = True
-                                last_unknown_frame = frame.copy()
+                                # frame is a fresh cv2.flip() output each loop and only
+                                # `display` is drawn on, so keep a reference, not a copy
+                                last_unknown_frame = frame
 
                     if unknown_detected_this_cycle:
                         if unknown_start_time is None:
@@ -2073,22 +2078,21 @@ def live_camera_door_lock():
                             confidence = 0
                             
                             # Compare with known faces
-                            if service.known_face_encodings:
-                                face_distances = face_recognition.face_distance(
-                                    service.known_face_encodings, 
-                                    face_encoding
-                                )
+                            # One snapshot: a reload must not swap the lists mid-match
+                            gallery = service.gallery
+                            if len(gallery):
+                                # Best match + runner-up straight from the gallery index
+                                face_distances, face_indices = gallery.index.search(face_encoding, k=2)
                                 
                                 if len(face_distances) > 0:
-                                    best_match_index = np.argmin(face_distances)
-                                    best_distance = face_distances[best_match_index]
-                                    sorted_distances = np.sort(face_distances)
-                                    second_best_distance = sorted_distances[1] if len(sorted_distances) > 1 else 1.0
+                                    best_match_index = int(face_indices[0])
+                                    best_distance = float(face_distances[0])
+                                    second_best_distance = float(face_distances[1]) if len(face_distances) > 1 else 1.0
                                     distance_gap = float(second_best_distance - best_distance)
-                                    is_separated = len(sorted_distances) == 1 or distance_gap >= MATCH_SEPARATION_MARGIN
+                                    is_separated = len(face_distances) == 1 or distance_gap >= MATCH_SEPARATION_MARGIN
                                     
                                     if best_distance <= RECOGNITION_TOLERANCE and is_separated:
-                                        student = service.known_students[best_match_index]
+                                        student = gallery.students[best_match_index]
                                         confidence = 1 - best_distance
                                         name = student.name
                                         
@@ -2170,7 +2174,9 @@ def live_camera_door_lock():
 
                             if status == 'unknown':
                                 unknown_detected_this_cycle = True
-                                last_unknown_frame = frame.copy()
+                                # frame is a fresh cv2.flip() output each loop and only
+                                # `display` is drawn on, so keep a reference, not a copy
+                                last_unknown_frame = frame
 
                     if unknown_detected_this_cycle:
                         if unknown_start_time is None:
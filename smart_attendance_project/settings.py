@@ -146,6 +146,8 @@ FACE_RECOGNITION_MIN_CONFIDENCE = 0.62
 FACE_RECOGNITION_MIN_GAP = 0.06
 FACE_RECOGNITION_CONFIRM_FRAMES = 2
 FACE_RECOGNITION_CONFIRM_WINDOW_SECONDS = 1.5
+FACE_GALLERY_CACHE_DIR = BASE_DIR / 'face_cache'  # Stacked encodings (.npz) reused across restarts
+FACE_INDEX_HNSW_MIN_SIZE = 5000  # Galleries this large use an approximate HNSW index (needs faiss)
 FULL_MODE_MOTION_TIMEOUT_SECONDS = 10
 FULL_MODE_ALERT_COOLDOWN_SECONDS = 10
 FULL_MODE_MOTION_REARM_SECONDS = 2
@@ -207,6 +209,40 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_NOTIFICATIONS_ENABLED = env.bool('CELERY_NOTIFICATIONS_ENABLED', default=True)
 
+# Optional shared cache (e.g. redis://127.0.0.1:6379/2). Without it each
+# process has its own LocMem cache, and caches that must reflect the door
+# system's writes (admin changelists) stay disabled.
+CACHE_URL = env('CACHE_URL', default='')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+
+# Notification messages are queued and written to the console by a
+# listener thread, so senders never block on stdout
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'notification': {'format': '   %(message)s'},
+    },
+    'handlers': {
+        'notification_console': {
+            '()': 'attendance.logging_handlers.QueuedConsoleHandler',
+            'formatter': 'notification',
+        },
+    },
+    'loggers': {
+        'attendance.services.notification_service': {
+            'handlers': ['notification_console'],
+            'level': 'INFO',
+        },
+    },
+}
+
 # Enable/Disable notifications
 NOTIFICATIONS_ENABLED = True
 EMAIL_NOTIFICATIONS = True